@@ -0,0 +1,219 @@
+from typing import Dict, Optional, Tuple, Union
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import replace
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+
+from engine.game import SequenceGame
+from engine.models import Player
+from engine.ai import SequenceAI, MoveAborted
+
+# Default per-move budget (seconds) for a bot move requested over the API
+AI_TIME_LIMIT = 10.0
+# Shared cancel flags for process workers, one per in-flight request
+CANCEL_SLOTS = 256
+
+Move = Optional[Tuple[int, Tuple[int, int]]]
+
+class AIMoveCancelled(Exception):
+    """The request was abandoned through AIRunner.cancel (or superseded)."""
+
+# In pool workers: the flags array inherited from the parent
+_cancel_flags = None
+
+def _init_worker(flags, table_size: Optional[int]):
+    global _cancel_flags
+    _cancel_flags = flags
+    if table_size is not None:
+        SequenceAI.table.resize(table_size)
+
+def _compute_move(game: SequenceGame, player_id: int, deadline: Optional[float],
+                  cancel: Union[int, threading.Event, None]) -> Optional[Tuple[Move, tuple]]:
+    """Runs in a worker on a private clone of the game.
+
+    cancel is a flag slot (process pool) or an Event (thread pool); the
+    search polls it and the deadline, and None is returned once either trips.
+    Otherwise returns the move and the clone's RNG state afterwards.
+    """
+    if isinstance(cancel, int):
+        cancelled = lambda: _cancel_flags[cancel] != 0
+    elif cancel is not None:
+        cancelled = cancel.is_set
+    else:
+        cancelled = lambda: False
+
+    def should_stop() -> bool:
+        return cancelled() or (deadline is not None and time.time() >= deadline)
+
+    player = game.players[player_id]
+    try:
+        if player.strategy == "mcts" and deadline is not None:
+            # Let the search finish on its own time limit, well inside the hard deadline
+            config = SequenceAI.mcts_config
+            limit = max(deadline - time.time(), 0.0) * 0.8
+            if config.time_limit is not None:
+                limit = min(config.time_limit, limit)
+            move = SequenceAI.get_mcts_move(game, player, replace(config, time_limit=limit), should_stop)
+        else:
+            move = SequenceAI.get_move(game, player, should_stop)
+    except MoveAborted:
+        return None
+    return move, game.rng.getstate()
+
+class AIRunner:
+    """Computes bot moves off the event loop.
+
+    Moves run on a process pool (the strategies are pure Python, so a thread
+    would still hold the GIL against the loop) on a clone of the game. MCTS
+    with workers > 1 already fans out to its own process pool, so it runs on
+    a thread here instead. Each request has a deadline and a cancel flag that
+    the worker polls, so an abandoned request frees its pool slot promptly.
+    """
+    def __init__(self, workers: Optional[int] = None, table_size: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        # Transposition table bound in each worker process (None: SequenceAI default)
+        self.table_size = table_size
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._flags = None
+        self._free_slots = list(range(CANCEL_SLOTS))
+        # key (game id / room code) -> (awaited future, worker future, cancel flag)
+        self.pending: Dict[str, Tuple[asyncio.Future, Future, Union[int, threading.Event, None]]] = {}
+
+    def executor(self, player: Player) -> Executor:
+        with self._lock:
+            if player.strategy == "mcts" and SequenceAI.mcts_config.workers > 1:
+                if self._threads is None:
+                    self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ai")
+                return self._threads
+            if self._processes is None:
+                if self._flags is None:
+                    self._flags = multiprocessing.RawArray("b", CANCEL_SLOTS)
+                self._processes = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                      initargs=(self._flags, self.table_size))
+            return self._processes
+
+    def _submit(self, player: Player, clone: SequenceGame, deadline: Optional[float]):
+        executor = self.executor(player)
+        cancel: Union[int, threading.Event, None] = None
+        if executor is self._threads:
+            cancel = threading.Event()
+        else:
+            with self._lock:
+                if self._free_slots:
+                    cancel = self._free_slots.pop()
+        # A flag slot has two holders: the worker and the awaiting get_move.
+        # It is cleared and reused only once both are done with it, so a late
+        # signal from the awaiting side can never hit the next request.
+        holders = [2]
+        try:
+            future = executor.submit(_compute_move, clone, player.id, deadline, cancel)
+        except BrokenProcessPool:
+            self._release(cancel)
+            raise
+        future.add_done_callback(lambda _: self._drop(cancel, holders))
+        return future, cancel, holders
+
+    def _drop(self, cancel, holders: list):
+        with self._lock:
+            holders[0] -= 1
+            if holders[0]:
+                return
+        self._release(cancel)
+
+    def _release(self, cancel):
+        if isinstance(cancel, int):
+            with self._lock:
+                self._flags[cancel] = 0
+                self._free_slots.append(cancel)
+
+    def _signal(self, cancel):
+        if isinstance(cancel, int):
+            self._flags[cancel] = 1
+        elif cancel is not None:
+            cancel.set()
+
+    async def get_move(self, key: str, game: SequenceGame, player: Player,
+                       time_limit: Optional[float] = AI_TIME_LIMIT) -> Tuple[Move, tuple]:
+        """Async SequenceAI.get_move for the live game.
+
+        Returns (move, rng_state): rng_state is where the game's RNG would be
+        after an inline get_move, and the caller applies it only if it plays
+        the result, so discarded moves leave seeded games reproducible. The
+        game itself is never touched.
+
+        A newer request for the same key supersedes this one. Raises
+        asyncio.TimeoutError when the budget runs out and AIMoveCancelled when
+        cancelled; in both cases the worker is told to stop as well.
+        """
+        deadline = time.time() + time_limit if time_limit is not None else None
+        clone = game.clone()
+        try:
+            cfuture, cancel, holders = self._submit(player, clone, deadline)
+        except BrokenProcessPool:
+            # A worker died earlier; start a fresh pool
+            self._reset_processes()
+            cfuture, cancel, holders = self._submit(player, clone, deadline)
+        future = asyncio.wrap_future(cfuture)
+
+        self.cancel(key)
+        self.pending[key] = (future, cfuture, cancel)
+        done = False
+        try:
+            result = await asyncio.wait_for(future, time_limit)
+            done = True
+        except asyncio.CancelledError:
+            if future.cancelled() and not asyncio.current_task().cancelling():
+                raise AIMoveCancelled() from None
+            raise
+        except BrokenProcessPool:
+            self._reset_processes()
+            raise
+        finally:
+            if not done:
+                self._signal(cancel)
+            if key in self.pending and self.pending[key][0] is future:
+                del self.pending[key]
+            self._drop(cancel, holders)
+        if result is None:
+            # The worker hit the deadline (or its flag) just before we did
+            raise asyncio.TimeoutError()
+        return result
+
+    def _reset_processes(self):
+        with self._lock:
+            if self._processes is not None:
+                self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+
+    def cancel(self, key: str) -> bool:
+        """Abandons the in-flight request for key, if any."""
+        entry = self.pending.pop(key, None)
+        # The worker's own future: the awaited wrapper only hears about
+        # completion later, on the event loop
+        if entry is None or entry[1].done():
+            return False
+        future, _, cancel = entry
+        self._signal(cancel)
+        future.cancel()
+        return True
+
+    def shutdown(self):
+        for future, _, cancel in list(self.pending.values()):
+            self._signal(cancel)
+            future.cancel()
+        self.pending.clear()
+        with self._lock:
+            if self._processes is not None:
+                self._processes.shutdown(wait=False, cancel_futures=True)
+            if self._threads is not None:
+                self._threads.shutdown(wait=False, cancel_futures=True)
+            self._processes = self._threads = None
+
+# Global instance
+ai_runner = AIRunner()
@@ -1,10 +1,107 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
 import random
 import string
 import json
+import time
 from fastapi import WebSocket
 
 from engine.game import SequenceGame
+from backend.serialization import DeltaStream, full_message
+
+# Per-connection outgoing queue bound and per-send timeout (seconds). A socket
+# whose queue fills up or whose send stalls past the timeout is evicted.
+SEND_QUEUE_SIZE = 32
+SEND_TIMEOUT = 5.0
+# Read-only viewers allowed per room
+MAX_SPECTATORS = 500
+
+class SendMetrics:
+    """Counters for a room's outgoing traffic."""
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.evicted = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.max_queue_depth = 0
+
+    def record_send(self, latency: float):
+        self.sent += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def snapshot(self) -> dict:
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "evicted": self.evicted,
+            "avgSendLatencyMs": self.total_latency / self.sent * 1000 if self.sent else 0.0,
+            "maxSendLatencyMs": self.max_latency * 1000,
+            "maxQueueDepth": self.max_queue_depth,
+        }
+
+class Connection:
+    """One socket's outgoing side: a bounded queue drained by its own writer task.
+
+    Messages are pre-encoded text, so a broadcast encodes once and only
+    enqueues; a slow client backs up its own queue instead of delaying the
+    others. When the queue is full, a send times out or fails, the
+    connection is evicted (closed and dropped from the room).
+    """
+    def __init__(self, websocket: WebSocket, room: "GameRoom"):
+        self.websocket = websocket
+        self.room = room
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.closed = False
+        self.writer = asyncio.create_task(self._write())
+
+    def send(self, text: str):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            self.evict(reason="Send queue full")
+            return
+        metrics = self.room.metrics
+        metrics.max_queue_depth = max(metrics.max_queue_depth, self.queue.qsize())
+
+    async def _write(self):
+        while True:
+            text = await self.queue.get()
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self.websocket.send_text(text), SEND_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.evict(reason="Send timeout")
+                return
+            except Exception:
+                # Peer is gone; the receive loop will see the disconnect too
+                self.room.metrics.failed += 1
+                self.evict()
+                return
+            self.room.metrics.record_send(time.perf_counter() - start)
+
+    def evict(self, reason: Optional[str] = None):
+        if self.closed:
+            return
+        if reason:
+            self.room.metrics.evicted += 1
+        self.room.disconnect(self.websocket)
+        if reason:
+            asyncio.create_task(self._close(reason))
+
+    async def _close(self, reason: str):
+        try:
+            await asyncio.wait_for(self.websocket.close(code=1008, reason=reason), SEND_TIMEOUT)
+        except Exception:
+            pass
+
+    def close(self):
+        self.closed = True
+        if self.writer is not asyncio.current_task():
+            self.writer.cancel()
 
 class GameRoom:
     def __init__(self, room_id: str):
@@ -12,8 +109,17 @@ class GameRoom:
         self.game = SequenceGame(num_players=2) 
         self.slots: Dict[int, Optional[WebSocket]] = {0: None, 1: None}
         self.host_ws: Optional[WebSocket] = None
+        # Sockets that asked for STATE_DELTA messages instead of full states
+        self.delta_clients: Set[WebSocket] = set()
+        self.deltas = DeltaStream(room_id, self.game)
+        self.connections: Dict[WebSocket, Connection] = {}
+        self.metrics = SendMetrics()
+        # Read-only viewers; they get the state with hands stripped
+        self.spectators: Set[WebSocket] = set()
+        self.spectator_deltas = DeltaStream(room_id, self.game, spectator=True)
+        self._spectator_full: Optional[Tuple[int, str]] = None
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, delta: bool = False):
         await websocket.accept()
         
         # Find Empty Slot
@@ -30,9 +136,12 @@ class GameRoom:
             
         if not self.host_ws:
             self.host_ws = websocket
+        if delta:
+            self.delta_clients.add(websocket)
+        self.connections[websocket] = Connection(websocket, self)
 
         # Send Welcome
-        await websocket.send_json({
+        self.send(websocket, {
             "type": "WELCOME",
             "playerId": player_id,
             "roomCode": self.room_id
@@ -45,7 +154,30 @@ class GameRoom:
             "count": count
         })
 
+    async def connect_spectator(self, websocket: WebSocket, delta: bool = False) -> bool:
+        await websocket.accept()
+        if len(self.spectators) >= MAX_SPECTATORS:
+            await websocket.close(code=4000, reason="Too Many Spectators")
+            return False
+
+        self.spectators.add(websocket)
+        if delta:
+            self.delta_clients.add(websocket)
+        self.connections[websocket] = Connection(websocket, self)
+        self.send(websocket, {
+            "type": "WELCOME",
+            "playerId": None,
+            "spectator": True,
+            "roomCode": self.room_id
+        })
+        return True
+
     def disconnect(self, websocket: WebSocket):
+        self.delta_clients.discard(websocket)
+        self.spectators.discard(websocket)
+        conn = self.connections.pop(websocket, None)
+        if conn:
+            conn.close()
         for pid, ws in self.slots.items():
             if ws == websocket:
                 self.slots[pid] = None
@@ -53,14 +185,66 @@ class GameRoom:
                     self.host_ws = None
                 break
                 
+    def send(self, websocket: WebSocket, message: dict):
+        """Queues a message for one socket; never waits on the network."""
+        conn = self.connections.get(websocket)
+        if conn:
+            conn.send(json.dumps(message))
+
     async def broadcast(self, message: dict):
-        # Broadcast to all occupied slots
-        for ws in self.slots.values():
-            if ws is not None:
-                try:
-                    await ws.send_json(message)
-                except:
-                    pass # Disconnect handled in receive loop usually
+        # Encode once, then queue for all connections
+        text = json.dumps(message)
+        for conn in list(self.connections.values()):
+            conn.send(text)
+
+    async def send_state(self, websocket: WebSocket):
+        """Full STATE_UPDATE to one socket (on connect and on RESYNC)."""
+        conn = self.connections.get(websocket)
+        if not conn:
+            return
+        if websocket in self.spectators:
+            conn.send(self._spectator_state_text())
+        else:
+            conn.send(json.dumps(self.deltas.sync()))
+
+    def _spectator_state_text(self) -> str:
+        # Encoded once per version and shared by every joining/resyncing spectator
+        version = self.game.version
+        if self._spectator_full is None or self._spectator_full[0] != version:
+            self._spectator_full = (version, json.dumps(self.spectator_deltas.sync()))
+        return self._spectator_full[1]
+
+    async def broadcast_state(self):
+        """Sends the new game state: a delta to opted-in sockets, the full state to the rest.
+
+        Each variant (player/spectator, delta/full) is encoded at most once
+        and the same string is queued on every socket that wants it.
+        """
+        texts: Dict[Tuple[bool, bool], str] = {}
+        if self.spectators & self.delta_clients:
+            texts[True, True] = json.dumps(self.spectator_deltas.next())
+        if self.delta_clients - self.spectators:
+            texts[False, True] = json.dumps(self.deltas.next())
+        for ws, conn in list(self.connections.items()):
+            key = (ws in self.spectators, ws in self.delta_clients)
+            text = texts.get(key)
+            if text is None:
+                # Full state; delta variants were built above
+                if key[0]:
+                    text = self._spectator_state_text()
+                else:
+                    text = json.dumps(full_message(self.room_id, self.game))
+                texts[key] = text
+            conn.send(text)
+
+    def stats(self) -> dict:
+        """Send metrics plus the current queue depth of each connection."""
+        return {
+            **self.metrics.snapshot(),
+            "connections": len(self.connections),
+            "spectators": len(self.spectators),
+            "queueDepths": [conn.queue.qsize() for conn in self.connections.values()],
+        }
 
 class ConnectionManager:
     def __init__(self):
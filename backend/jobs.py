@@ -0,0 +1,152 @@
+from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+import bisect
+import os
+import threading
+import time
+import uuid
+
+from engine.simulation import SimulationRunner, RunningStats, new_master_seed
+
+class SimulationJob:
+    def __init__(self, job_id: str, trials: int, board_type: str, strategy_p1: str, strategy_p2: str,
+                 master_seed: int):
+        self.id = job_id
+        self.trials = trials
+        self.board_type = board_type
+        self.strategy_p1 = strategy_p1
+        self.strategy_p2 = strategy_p2
+        self.master_seed = master_seed
+        self.status = "queued" # queued, running, completed, cancelled, failed
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.stats = RunningStats()
+        self.records: List[dict] = []
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+
+    def summary(self) -> dict:
+        with self.lock:
+            return {
+                "jobId": self.id,
+                "status": self.status,
+                "error": self.error,
+                "trials": self.trials,
+                "completed": self.stats.games,
+                "boardType": self.board_type,
+                "strategies": [self.strategy_p1, self.strategy_p2],
+                "masterSeed": self.master_seed,
+                "createdAt": self.created_at,
+                "finishedAt": self.finished_at,
+                "aggregates": self.stats.snapshot(),
+            }
+
+    def page(self, offset: int, limit: int, cursor: Optional[int] = None) -> dict:
+        # Rows are in completion order while running and game_id order once done.
+        # cursor is the last game_id already seen; it only applies once the job
+        # has completed, when rows are sorted and game ids are stable positions.
+        with self.lock:
+            if cursor is not None:
+                if self.status != "completed":
+                    raise ValueError("cursor paging is only available once the job has completed; use offset")
+                offset = bisect.bisect_right(self.records, cursor, key=lambda record: record["game_id"])
+            rows = self.records[offset:offset + limit]
+            total = len(self.records)
+            done = self.status == "completed"
+        next_cursor = rows[-1]["game_id"] if done and rows and offset + len(rows) < total else None
+        return {"jobId": self.id, "status": self.status, "offset": offset, "total": total, "rows": rows,
+                "nextCursor": next_cursor}
+
+class JobManager:
+    """Runs Monte Carlo batches in the background on a shared process pool.
+
+    Each job is driven by a thread that feeds games to the pool and folds
+    results into the job's running aggregates, so request handlers only
+    ever read job state.
+    """
+    def __init__(self, workers: Optional[int] = None, max_finished: int = 100):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_finished = max_finished
+        self.jobs: Dict[str, SimulationJob] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def submit(self, trials: int, board_type: str, strategy_p1: str, strategy_p2: str,
+               master_seed: Optional[int] = None) -> SimulationJob:
+        job = SimulationJob(uuid.uuid4().hex, trials, board_type, strategy_p1, strategy_p2,
+                            master_seed if master_seed is not None else new_master_seed())
+        self._add(job)
+        threading.Thread(target=self._run, args=(job,), daemon=True).start()
+        return job
+
+    def store(self, records: List[dict], board_type: str, strategy_p1: str, strategy_p2: str,
+              master_seed: int) -> SimulationJob:
+        """Keeps the rows of a batch that already ran, so they can be paged like a job's."""
+        job = SimulationJob(uuid.uuid4().hex, len(records), board_type, strategy_p1, strategy_p2, master_seed)
+        for record in records:
+            job.stats.update(record)
+        job.records = sorted(records, key=lambda record: record["game_id"])
+        job.status = "completed"
+        job.finished_at = time.time()
+        self._add(job)
+        return job
+
+    def _add(self, job: SimulationJob):
+        self.jobs[job.id] = job
+        # Drop the oldest finished jobs beyond max_finished; running ones stay
+        finished = [j for j in self.jobs.values() if j.finished_at is not None]
+        for old in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[old.id]
+
+    def get(self, job_id: str) -> Optional[SimulationJob]:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[SimulationJob]:
+        job = self.jobs.get(job_id)
+        if job:
+            job.cancel_event.set()
+        return job
+
+    def _run(self, job: SimulationJob):
+        job.status = "running"
+        stream = SimulationRunner.iter_batch(job.trials, job.board_type, job.strategy_p1, job.strategy_p2,
+                                             workers=self.workers, master_seed=job.master_seed,
+                                             executor=self.pool)
+        try:
+            for record in stream:
+                with job.lock:
+                    job.records.append(record)
+                    job.stats.update(record)
+                if job.cancel_event.is_set():
+                    break
+            with job.lock:
+                if job.cancel_event.is_set():
+                    job.status = "cancelled"
+                else:
+                    job.records.sort(key=lambda record: record["game_id"])
+                    job.status = "completed"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            stream.close()
+            job.finished_at = time.time()
+
+    def shutdown(self):
+        for job in self.jobs.values():
+            job.cancel_event.set()
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+# Global instance
+jobs = JobManager()
@@ -1,6 +1,10 @@
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Body, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 import uuid
+import json
+import asyncio
+import pandas as pd
 import sys
 import os
 
@@ -8,15 +12,20 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from engine.game import SequenceGame
-from engine.ai import SequenceAI
-from engine.simulation import SimulationRunner
+from engine.simulation import SimulationRunner, RunningStats, new_master_seed, summarize_results, JACK_COLUMNS
 from backend.models import *
 from backend.store import games
 from backend.connection_manager import manager
+from backend.jobs import jobs
+from backend.ai_runner import ai_runner, AIMoveCancelled, AI_TIME_LIMIT
+from backend.serialization import serialize_state, serialize_state_json
 from fastapi import WebSocket, WebSocketDisconnect
 
 app = FastAPI(title="Sequence Game API")
 
+# Upper bound for turn histograms requested by clients
+MAX_HISTOGRAM_BINS = 200
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -25,56 +34,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def serialize_state(game_id: str, game: SequenceGame) -> GameState:
-    # Convert Board
-    board_cells = []
-    for r in range(10):
-        row_cells = []
-        for c in range(10):
-            card = game.board.grid[r][c]
-            state_val = game.board.state[r][c]
-            locked = game.board.locked[r][c]
-            is_corner = game.board.is_corner(r, c)
-            
-            c_model = None
-            if card:
-                c_model = CardModel(rank=card.rank.value, suit=card.suit.value, label=str(card))
-                
-            label = "FREE" if is_corner else (str(card) if card else "")
-            
-            row_cells.append(BoardCell(
-                r=r, c=c,
-                label=label,
-                card=c_model,
-                chipTeam=state_val,
-                isLocked=locked,
-                isCorner=is_corner
-            ))
-        board_cells.append(row_cells)
-
-    # Convert Players
-    p_models = []
-    for p in game.players:
-        hand_labels = [str(c) for c in p.hand]
-        p_models.append(PlayerState(
-            id=p.id,
-            teamId=p.team_id,
-            hand=hand_labels,
-            isBot=p.is_bot
-        ))
-
-    return GameState(
-        gameId=game_id,
-        board=board_cells,
-        players=p_models,
-        currentTurnIndex=game.current_turn_index,
-        currentPlayerId=game.current_player.id,
-        currentTeamId=game.current_player.team_id,
-        winnerTeam=game.winner,
-        log=game.log[-10:], # Last 10 logs
-        cardsLeft=len(game.deck.cards)
-    )
-
 @app.post("/api/game/new", response_model=GameState)
 def new_game(req: NewGameRequest):
     game_id = str(uuid.uuid4())
@@ -111,7 +70,8 @@ def new_game(req: NewGameRequest):
 @app.get("/api/game/{game_id}/state", response_model=GameState)
 def get_state(game_id: str):
     if game_id not in games: raise HTTPException(404, "Game not found")
-    return serialize_state(game_id, games[game_id])
+    # Pre-encoded and memoized per game version, so polling is cheap
+    return Response(content=serialize_state_json(game_id, games[game_id]), media_type="application/json")
 
 @app.get("/api/game/{game_id}/legal-moves", response_model=LegalMoveResponse)
 def get_legal_moves(game_id: str, handIndex: int):
@@ -164,7 +124,7 @@ def replace_dead_card(game_id: str, req: MoveRequest): # Reusing MoveRequest for
     return serialize_state(game_id, game)
 
 @app.post("/api/game/{game_id}/ai-step", response_model=GameState)
-def ai_step(game_id: str, steps: int = Body(1, embed=True)):
+async def ai_step(game_id: str, steps: int = Body(1, embed=True), timeLimit: float = Body(AI_TIME_LIMIT, embed=True)):
     if game_id not in games: raise HTTPException(404, "Game not found")
     game = games[game_id]
     
@@ -172,11 +132,25 @@ def ai_step(game_id: str, steps: int = Body(1, embed=True)):
     if game.winner is not None:
          return serialize_state(game_id, game)
 
-    for _ in range(steps):
+    for step in range(steps):
         if game.winner is not None: break
         
         p = game.current_player
-        move = SequenceAI.get_move(game, p)
+        # Computed off the event loop; timeLimit is the budget per move
+        version = game.version
+        try:
+            move, rng_state = await ai_runner.get_move(game_id, game, p, timeLimit)
+        except asyncio.TimeoutError:
+            if step == 0: raise HTTPException(504, "AI move timed out")
+            break # Keep the moves already made
+        except AIMoveCancelled:
+            if step == 0: raise HTTPException(409, "AI move cancelled")
+            break
+        if game.version != version:
+            # Someone else moved while the AI was thinking; the move is stale
+            break
+        # Advance the RNG only for a move we actually play
+        game.rng.setstate(rng_state)
         if move:
             game.play_move(move[0], move[1])
         else:
@@ -191,25 +165,98 @@ def ai_step(game_id: str, steps: int = Body(1, embed=True)):
                 
     return serialize_state(game_id, game)
 
+@app.delete("/api/game/{game_id}/ai-step")
+def cancel_ai_step(game_id: str):
+    if game_id not in games: raise HTTPException(404, "Game not found")
+    return {"cancelled": ai_runner.cancel(game_id)}
+
 @app.post("/api/simulate/monte-carlo")
-def run_simulation(trials: int = Body(...), boardType: str = Body("standard"), aiLevel: str = Body("smart")):
+def run_simulation(trials: int = Body(...), boardType: str = Body("standard"), aiLevel: str = Body("smart"),
+                   seed: Optional[int] = Body(None),
+                   aggregates: List[str] = Body(["win_rates", "turns_histogram", "jack_usage"]),
+                   histogramBins: int = Body(20, ge=1, le=MAX_HISTOGRAM_BINS), pageSize: int = Body(20)):
     # Run simulation
     # We reuse SimulationRunner
+    df = SimulationRunner.run_batch(trials, boardType, "smart", aiLevel, master_seed=seed)
     
-    # We need to adapt SimulationRunner to return exact stats we need
-    df = SimulationRunner.run_batch(trials, boardType, "smart", aiLevel)
-    
-    # Aggregate
+    # Aggregate server-side; only the first page of raw rows is sent. The rest
+    # stay on the server and are paged via /api/simulate/jobs/{resultsId}/results.
     win_counts = df['winner'].value_counts().to_dict()
     avg_turns = df['turns'].mean()
+    stored = jobs.store(df.to_dict(orient="records"), boardType, "smart", aiLevel, df.attrs["master_seed"])
+    page = stored.page(0, min(max(pageSize, 0), 1000))
     
     return {
         "games": trials,
+        "masterSeed": df.attrs["master_seed"],
         "win_rates": win_counts,
         "avg_turns": avg_turns,
-        "stats": df.to_dict(orient="records")
+        "aggregates": summarize_results(df, aggregates, histogramBins),
+        "resultsId": stored.id,
+        "stats": page["rows"],
+        "nextCursor": page["nextCursor"],
     }
 
+@app.post("/api/simulate/monte-carlo/stream")
+def stream_simulation(trials: int = Body(..., ge=1), boardType: str = Body("standard"), aiLevel: str = Body("smart"),
+                      seed: Optional[int] = Body(None), every: int = Body(10, ge=1)):
+    # Newline-delimited JSON: a running-aggregate snapshot every `every` games
+    # and always a final one with done=true. Per-game rows are not kept, so memory stays flat.
+    master_seed = seed if seed is not None else new_master_seed()
+
+    def events():
+        stats = RunningStats()
+        for record in SimulationRunner.iter_batch(trials, boardType, "smart", aiLevel, master_seed=master_seed):
+            stats.update(record)
+            if stats.games % every == 0 and stats.games < trials:
+                yield json.dumps({"masterSeed": master_seed, "done": False, **stats.snapshot()}) + "\n"
+        yield json.dumps({"masterSeed": master_seed, "done": True, **stats.snapshot()}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+# --- Background Simulation Jobs ---
+
+@app.post("/api/simulate/jobs")
+def submit_simulation_job(trials: int = Body(...), boardType: str = Body("standard"), aiLevel: str = Body("smart"),
+                          seed: Optional[int] = Body(None)):
+    job = jobs.submit(trials, boardType, "smart", aiLevel, master_seed=seed)
+    return job.summary()
+
+@app.get("/api/simulate/jobs/{job_id}")
+def get_simulation_job(job_id: str):
+    job = jobs.get(job_id)
+    if not job: raise HTTPException(404, "Job not found")
+    return job.summary()
+
+@app.get("/api/simulate/jobs/{job_id}/results")
+def get_simulation_job_results(job_id: str, offset: int = 0, limit: int = 100, cursor: Optional[int] = None):
+    job = jobs.get(job_id)
+    if not job: raise HTTPException(404, "Job not found")
+    try:
+        return job.page(max(offset, 0), min(max(limit, 1), 1000), cursor)
+    except ValueError as e:
+        raise HTTPException(409, str(e))
+
+@app.get("/api/simulate/jobs/{job_id}/aggregates")
+def get_simulation_job_aggregates(job_id: str, histogramBins: int = Query(20, ge=1, le=MAX_HISTOGRAM_BINS)):
+    job = jobs.get(job_id)
+    if not job: raise HTTPException(404, "Job not found")
+    with job.lock:
+        df = pd.DataFrame(job.records, columns=["winner", "turns", *JACK_COLUMNS])
+    return {"jobId": job.id, "status": job.status, "games": len(df),
+            "aggregates": summarize_results(df, turn_bins=histogramBins)}
+
+@app.delete("/api/simulate/jobs/{job_id}")
+def cancel_simulation_job(job_id: str):
+    job = jobs.cancel(job_id)
+    if not job: raise HTTPException(404, "Job not found")
+    return job.summary()
+
+@app.on_event("shutdown")
+def shutdown_jobs():
+    jobs.shutdown()
+    ai_runner.shutdown()
+
 # --- Room / Multiplayer Endpoints ---
 
 @app.post("/api/rooms/create")
@@ -217,6 +264,34 @@ async def create_room():
     room_code = manager.create_room()
     return {"roomCode": room_code}
 
+@app.get("/api/rooms/{room_code}/metrics")
+async def get_room_metrics(room_code: str):
+    room = manager.get_room(room_code)
+    if not room: raise HTTPException(404, "Room not found")
+    return room.stats()
+
+@app.websocket("/ws/{room_code}/spectate")
+async def spectate_endpoint(websocket: WebSocket, room_code: str):
+    room = manager.get_room(room_code)
+    if not room:
+        await websocket.close(code=4000, reason="Room not found")
+        return
+
+    if not await room.connect_spectator(websocket, delta=websocket.query_params.get("protocol") == "delta"):
+        return
+
+    try:
+        await room.send_state(websocket)
+        while True:
+            # Read-only: everything but RESYNC is ignored
+            data = await websocket.receive_json()
+            if data.get("type") == "RESYNC":
+                await room.send_state(websocket)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        room.disconnect(websocket)
+
 @app.websocket("/ws/{room_code}")
 async def websocket_endpoint(websocket: WebSocket, room_code: str):
     room = manager.get_room(room_code)
@@ -224,21 +299,22 @@ async def websocket_endpoint(websocket: WebSocket, room_code: str):
         await websocket.close(code=4000, reason="Room not found")
         return
 
-    await room.connect(websocket)
+    # ?protocol=delta opts in to STATE_DELTA messages after the initial full state
+    await room.connect(websocket, delta=websocket.query_params.get("protocol") == "delta")
     
     try:
         # Send initial state
-        await websocket.send_json({
-            "type": "STATE_UPDATE",
-            "state": serialize_state(room_code, room.game).dict()
-        })
+        await room.send_state(websocket)
 
         while True:
             data = await websocket.receive_json()
             # Handle client events (MOVE, JOIN_TEAM, etc)
             event_type = data.get("type")
             
-            if event_type == "MOVE":
+            if event_type == "RESYNC":
+                # Client saw a version gap; start it over from a full state
+                await room.send_state(websocket)
+            elif event_type == "MOVE":
                 try:
                     # Find player ID for this websocket
                     player_id = -1
@@ -273,10 +349,7 @@ async def websocket_endpoint(websocket: WebSocket, room_code: str):
                         if success:
                             # Broadcast new state
                             print("[DEBUG] Broadcasting State Update")
-                            await room.broadcast({
-                                "type": "STATE_UPDATE",
-                                "state": serialize_state(room_code, room.game).dict()
-                            })
+                            await room.broadcast_state()
                         else:
                             print("[DEBUG] Move invalid according to engine.")
                 except Exception as e:
@@ -284,7 +357,10 @@ async def websocket_endpoint(websocket: WebSocket, room_code: str):
                     import traceback
                     traceback.print_exc()
                 
-    except WebSocketDisconnect:
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: socket was already closed by an eviction
+        pass
+    finally:
         room.disconnect(websocket)
 
 if __name__ == "__main__":
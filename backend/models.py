@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Union
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Optional, Dict, Union
 from enum import Enum
 
+from engine.zobrist import MAX_TEAMS
+
 class ActionType(str, Enum):
     PLACE = "PLACE"
     TWO_EYED = "TWO_EYED"
@@ -41,11 +43,11 @@ class GameState(BaseModel):
     cardsLeft: int
 
 class NewGameRequest(BaseModel):
-    nPlayers: int = 2
-    teams: Optional[List[int]] = None # If None, auto assign 0, 1, 0, 1...
+    nPlayers: int = Field(2, ge=1, le=MAX_TEAMS)
+    teams: Optional[List[Annotated[int, Field(ge=0, lt=MAX_TEAMS)]]] = None # If None, auto assign 0, 1, 0, 1...
     boardType: str = "standard"
     seed: Optional[int] = None
-    aiLevel: str = "smart" # simple, smart
+    aiLevel: str = "smart" # random, smart, mcts
 
 class MoveRequest(BaseModel):
     handIndex: int
@@ -0,0 +1,196 @@
+from typing import Dict, List, Optional, Tuple
+
+from engine.game import SequenceGame
+from backend.models import BoardCell, CardModel, GameState, PlayerState
+
+class StateCache:
+    """Serialized GameState for one game, kept up to date incrementally.
+
+    The layout part of every cell (label, card, corner flag) is rendered once.
+    When the game's version changes only cells whose chip or lock changed get
+    a new BoardCell; the GameState and its JSON are memoized per version, so
+    repeated polls of an unchanged game reuse the same objects.
+    """
+    def __init__(self, game_id: str, game: SequenceGame):
+        self.game_id = game_id
+        self.game = game
+        board = game.board
+        self.layout: List[List[Tuple[str, Optional[CardModel], bool]]] = []
+        for r in range(10):
+            row = []
+            for c in range(10):
+                card = board.grid[r][c]
+                is_corner = board.is_corner(r, c)
+                c_model = CardModel(rank=card.rank.value, suit=card.suit.value, label=str(card)) if card else None
+                label = "FREE" if is_corner else (str(card) if card else "")
+                row.append((label, c_model, is_corner))
+            self.layout.append(row)
+        # (chip, locked) each rendered cell was built from
+        self.cell_state: List[List[Optional[Tuple[Optional[int], bool]]]] = [[None] * 10 for _ in range(10)]
+        self.cells: List[List[Optional[BoardCell]]] = [[None] * 10 for _ in range(10)]
+        self._key = None
+        self._state: Optional[GameState] = None
+        self._json: Optional[bytes] = None
+        self._json_key = None
+        self._spectator_key = None
+        self._spectator_state: Optional[GameState] = None
+
+    def key(self) -> tuple:
+        # Team/bot flags can be edited on players directly, so they are part of the key
+        game = self.game
+        return game.version, tuple((p.team_id, p.is_bot) for p in game.players)
+
+    def refresh_board(self) -> List[Tuple[int, int]]:
+        """Re-renders cells whose chip or lock changed; returns those cells."""
+        board = self.game.board
+        changed = []
+        for r in range(10):
+            for c in range(10):
+                current = (board.get_chip(r, c), board.is_locked(r, c))
+                if current != self.cell_state[r][c]:
+                    label, c_model, is_corner = self.layout[r][c]
+                    self.cells[r][c] = BoardCell(
+                        r=r, c=c,
+                        label=label,
+                        card=c_model,
+                        chipTeam=current[0],
+                        isLocked=current[1],
+                        isCorner=is_corner
+                    )
+                    self.cell_state[r][c] = current
+                    changed.append((r, c))
+        return changed
+
+    def state(self) -> GameState:
+        key = self.key()
+        if key == self._key:
+            return self._state
+        self.refresh_board()
+        game = self.game
+        p_models = []
+        for p in game.players:
+            p_models.append(PlayerState(
+                id=p.id,
+                teamId=p.team_id,
+                hand=[str(c) for c in p.hand],
+                isBot=p.is_bot
+            ))
+        self._state = GameState(
+            gameId=self.game_id,
+            board=[row[:] for row in self.cells],
+            players=p_models,
+            currentTurnIndex=game.current_turn_index,
+            currentPlayerId=game.current_player.id,
+            currentTeamId=game.current_player.team_id,
+            winnerTeam=game.winner,
+            log=game.log[-10:], # Last 10 logs
+            cardsLeft=len(game.deck)
+        )
+        self._key = key
+        return self._state
+
+    def spectator_state(self) -> GameState:
+        """state() with every hand emptied, for read-only viewers.
+
+        Shares the board rows and cells with state(), so the cell identity
+        diff in DeltaStream works for it too.
+        """
+        state = self.state()
+        if self._spectator_key != self._key:
+            players = [p.model_copy(update={"hand": []}) for p in state.players]
+            self._spectator_state = state.model_copy(update={"players": players})
+            self._spectator_key = self._key
+        return self._spectator_state
+
+    def json(self) -> bytes:
+        state = self.state()
+        if self._json_key != self._key:
+            self._json = state.model_dump_json().encode()
+            self._json_key = self._key
+        return self._json
+
+# game id (or room code) -> cache
+state_caches: Dict[str, StateCache] = {}
+
+def get_cache(game_id: str, game: SequenceGame) -> StateCache:
+    cache = state_caches.get(game_id)
+    if cache is None or cache.game is not game:
+        cache = StateCache(game_id, game)
+        state_caches[game_id] = cache
+    return cache
+
+def serialize_state(game_id: str, game: SequenceGame) -> GameState:
+    return get_cache(game_id, game).state()
+
+def serialize_state_json(game_id: str, game: SequenceGame) -> bytes:
+    """serialize_state as encoded JSON, memoized per game version."""
+    return get_cache(game_id, game).json()
+
+def full_message(game_id: str, game: SequenceGame, spectator: bool = False) -> dict:
+    """STATE_UPDATE carrying the whole state and its version."""
+    cache = get_cache(game_id, game)
+    state = cache.spectator_state() if spectator else cache.state()
+    return {"type": "STATE_UPDATE", "version": game.version, "state": state.model_dump()}
+
+class DeltaStream:
+    """Encodes successive states of one game as STATE_DELTA messages.
+
+    A delta holds the cells (chip/lock) and players that changed since the
+    previously encoded state, the scalar fields, and the log entries appended
+    since then. baseVersion is the version it applies on top of; a client
+    whose version differs asks for a RESYNC and gets a full STATE_UPDATE.
+    With spectator=True both are built from the hand-less spectator state.
+    """
+    def __init__(self, game_id: str, game: SequenceGame, spectator: bool = False):
+        self.game_id = game_id
+        self.game = game
+        self.spectator = spectator
+        self.state: Optional[GameState] = None
+        self.version: Optional[int] = None
+        self.log_len = 0
+        self.log_generation = 0
+
+    def sync(self) -> dict:
+        """Full STATE_UPDATE for a (re)connecting client; later deltas build on it."""
+        message = full_message(self.game_id, self.game, self.spectator)
+        self._record(self._current())
+        return message
+
+    def _current(self) -> GameState:
+        cache = get_cache(self.game_id, self.game)
+        return cache.spectator_state() if self.spectator else cache.state()
+
+    def _record(self, state: GameState):
+        self.state = state
+        self.version = self.game.version
+        self.log_len = len(self.game.log)
+        self.log_generation = self.game.log.generation
+
+    def next(self) -> dict:
+        game = self.game
+        curr = self._current()
+        prev = self.state
+        if (prev is None or game.log.generation != self.log_generation or len(game.log) < self.log_len
+                or len(curr.players) != len(prev.players)):
+            # Nothing to diff against, or history was rewound (restore): send everything
+            message = full_message(self.game_id, game, self.spectator)
+        else:
+            # Unchanged cells are the very same BoardCell objects (see StateCache)
+            cells = [cell.model_dump() for row, old_row in zip(curr.board, prev.board)
+                     for cell, old in zip(row, old_row) if cell is not old]
+            players = [p.model_dump() for p, old in zip(curr.players, prev.players) if p != old]
+            message = {
+                "type": "STATE_DELTA",
+                "version": game.version,
+                "baseVersion": self.version,
+                "cells": cells,
+                "players": players,
+                "currentTurnIndex": curr.currentTurnIndex,
+                "currentPlayerId": curr.currentPlayerId,
+                "currentTeamId": curr.currentTeamId,
+                "winnerTeam": curr.winnerTeam,
+                "cardsLeft": curr.cardsLeft,
+                "log": game.log[max(self.log_len, len(game.log) - 10):],
+            }
+        self._record(curr)
+        return message
@@ -0,0 +1,201 @@
+from typing import List, Optional, Tuple, Dict
+import random
+from .board import Board, WINDOWS
+from .zobrist import CHIP_KEYS, LOCK_KEYS
+
+# Cell (r, c) maps to bit r * 10 + c, so ascending bit order == row-major order.
+ROWS = 10
+COLS = 10
+FULL_MASK = (1 << (ROWS * COLS)) - 1
+CORNER_MASK = (1 << 0) | (1 << 9) | (1 << 90) | (1 << 99)
+
+def _mask(pred) -> int:
+    m = 0
+    for r in range(ROWS):
+        for c in range(COLS):
+            if pred(r, c):
+                m |= 1 << (r * COLS + c)
+    return m
+
+# (stride, mask of cells a 5-line can start from) for H, V, \ and /
+LINE_SHIFTS: List[Tuple[int, int]] = [
+    (1, _mask(lambda r, c: c <= COLS - 5)),
+    (COLS, _mask(lambda r, c: r <= ROWS - 5)),
+    (COLS + 1, _mask(lambda r, c: r <= ROWS - 5 and c <= COLS - 5)),
+    (COLS - 1, _mask(lambda r, c: r <= ROWS - 5 and c >= 4)),
+]
+
+WINDOW_MASKS: List[int] = [sum(1 << (r * COLS + c) for r, c in window) for window in WINDOWS]
+
+def iter_cells(mask: int):
+    """Yields (r, c) for every set bit, in row-major order."""
+    while mask:
+        low = mask & -mask
+        idx = low.bit_length() - 1
+        yield divmod(idx, COLS)
+        mask ^= low
+
+def _line_starts(x: int, stride: int, start_mask: int) -> int:
+    return x & (x >> stride) & (x >> 2 * stride) & (x >> 3 * stride) & (x >> 4 * stride) & start_mask
+
+def count_sequences_mask(x: int) -> int:
+    """Sequences in a mask of team chips | CORNER_MASK.
+
+    Greedy from the lowest start bit: a run of n cells yields n // 5,
+    matching the list-based scan in board.count_sequences.
+    """
+    total = 0
+    for stride, start_mask in LINE_SHIFTS:
+        starts = _line_starts(x, stride, start_mask)
+        while starts:
+            low = starts & -starts
+            total += 1
+            for k in range(5):
+                starts &= ~(low << (k * stride))
+    return total
+
+def sequence_cells_mask(x: int) -> int:
+    """Mask of every cell inside a complete 5-line of x (team chips | CORNER_MASK)."""
+    cells = 0
+    for stride, start_mask in LINE_SHIFTS:
+        starts = _line_starts(x, stride, start_mask)
+        for k in range(5):
+            cells |= starts << (k * stride)
+    return cells
+
+class _GridView:
+    """Read-only `view[r][c]` access over a bitboard, for code written against list boards."""
+    def __init__(self, cell_fn):
+        self._cell_fn = cell_fn
+
+    def __getitem__(self, r: int) -> list:
+        return [self._cell_fn(r, c) for c in range(COLS)]
+
+    def __iter__(self):
+        for r in range(ROWS):
+            yield self[r]
+
+    def __len__(self):
+        return ROWS
+
+class BitBoard(Board):
+    """Board backend storing chips and locks as 100-bit integers.
+
+    Layout data (grid, card_positions) is identical to Board. Each team's chips,
+    the locked cells and the corners are integer masks, so copying is a handful
+    of int copies and sequence detection is shift/and arithmetic.
+    `state` and `locked` are read-only views kept for callers that index cells.
+    """
+    def __init__(self, rng: random.Random, layout_type: str = "standard", seed: Optional[int] = None):
+        super().__init__(rng, layout_type=layout_type, seed=seed)
+
+    def _init_chips(self):
+        self.team_masks: Dict[int, int] = {}
+        self.occupied = 0
+        self.locked_mask = 0
+        self._hash = 0
+
+    @property
+    def state(self) -> _GridView:
+        return _GridView(self.get_chip)
+
+    @property
+    def locked(self) -> _GridView:
+        return _GridView(self.is_locked)
+
+    def is_corner(self, r: int, c: int) -> bool:
+        return bool(CORNER_MASK >> (r * COLS + c) & 1)
+
+    def place_chip(self, r: int, c: int, team_id: int):
+        idx = r * COLS + c
+        bit = 1 << idx
+        if self.occupied & bit:
+            self._clear(idx, bit)
+        self.team_masks[team_id] = self.team_masks.get(team_id, 0) | bit
+        self.occupied |= bit
+        self._hash ^= CHIP_KEYS[team_id][idx]
+
+    def remove_chip(self, r: int, c: int):
+        idx = r * COLS + c
+        bit = 1 << idx
+        if self.occupied & bit:
+            self._clear(idx, bit)
+
+    def _clear(self, idx: int, bit: int):
+        for team_id, mask in self.team_masks.items():
+            if mask & bit:
+                self.team_masks[team_id] = mask & ~bit
+                self._hash ^= CHIP_KEYS[team_id][idx]
+        self.occupied &= ~bit
+
+    def get_chip(self, r: int, c: int) -> Optional[int]:
+        bit = 1 << (r * COLS + c)
+        if not self.occupied & bit:
+            return None
+        for team_id, mask in self.team_masks.items():
+            if mask & bit:
+                return team_id
+        return None
+
+    def is_locked(self, r: int, c: int) -> bool:
+        return bool(self.locked_mask >> (r * COLS + c) & 1)
+
+    def lock_cell(self, r: int, c: int):
+        self._set_locked(self.locked_mask | 1 << (r * COLS + c))
+
+    def unlock_cell(self, r: int, c: int):
+        self._set_locked(self.locked_mask & ~(1 << (r * COLS + c)))
+
+    def _set_locked(self, mask: int):
+        changed = mask ^ self.locked_mask
+        while changed:
+            low = changed & -changed
+            self._hash ^= LOCK_KEYS[low.bit_length() - 1]
+            changed ^= low
+        self.locked_mask = mask
+
+    def empty_cells(self) -> List[Tuple[int, int]]:
+        return list(iter_cells(FULL_MASK & ~(self.occupied | CORNER_MASK)))
+
+    def removable_cells(self, team_id: int) -> List[Tuple[int, int]]:
+        own = self.team_masks.get(team_id, 0)
+        return list(iter_cells(self.occupied & ~own & ~self.locked_mask))
+
+    def copy(self) -> "BitBoard":
+        clone = object.__new__(BitBoard)
+        clone.__dict__.update(self.__dict__)
+        clone.team_masks = dict(self.team_masks)
+        return clone
+
+    def snapshot(self) -> tuple:
+        return tuple(self.team_masks.items()), self.occupied, self.locked_mask, self._hash
+
+    def restore(self, snap: tuple):
+        team_masks, self.occupied, self.locked_mask, self._hash = snap
+        self.team_masks = dict(team_masks)
+
+    def count_sequences(self, team_id: int) -> int:
+        return count_sequences_mask(self.team_masks.get(team_id, 0) | CORNER_MASK)
+
+    def window_complete(self, w: int, team_id: int) -> bool:
+        mask = WINDOW_MASKS[w]
+        return (self.team_masks.get(team_id, 0) | CORNER_MASK) & mask == mask
+
+    def line_sequences(self, line: List[Tuple[int, int]], team_id: int) -> int:
+        x = self.team_masks.get(team_id, 0) | CORNER_MASK
+        total = 0
+        run = 0
+        for r, c in line:
+            if x >> (r * COLS + c) & 1:
+                run += 1
+            else:
+                total += run // 5
+                run = 0
+        return total + run // 5
+
+    def sequence_cells(self, team_id: int) -> int:
+        """Mask of every cell inside a complete 5-line for team_id."""
+        return sequence_cells_mask(self.team_masks.get(team_id, 0) | CORNER_MASK)
+
+    def lock_sequences(self, team_id: int):
+        self._set_locked(self.locked_mask | self.sequence_cells(team_id) & ~CORNER_MASK)
@@ -1,36 +1,84 @@
 from typing import List, Optional, Tuple, Dict
+from collections import OrderedDict
 import random
 from .models import Card, Rank, Suit, BoardState
+from .zobrist import CHIP_KEYS, LOCK_KEYS
 
-class Board:
-    def __init__(self, rng: random.Random, layout_type: str = "standard"):
-        self.rows = 10
-        self.cols = 10
-        self.grid: List[List[Optional[Card]]] = [[None for _ in range(self.cols)] for _ in range(self.rows)]
-        self.state: List[List[Optional[int]]] = [[None for _ in range(self.cols)] for _ in range(self.rows)]
-        self.locked: List[List[bool]] = [[False for _ in range(self.cols)] for _ in range(self.rows)]
-        self.locked: List[List[bool]] = [[False for _ in range(self.cols)] for _ in range(self.rows)]
-        self.card_positions: Dict[str, List[Tuple[int, int]]] = {}
-        self.rng = rng
+CORNERS = frozenset([(0, 0), (0, 9), (9, 0), (9, 9)])
 
-        if layout_type == "random":
-            self._generate_random_layout()
-        else:
-            self._generate_standard_layout()
+# Line geometry for the 10x10 board, computed once at import.
+# Directions are H (0, 1), V (1, 0), \ (1, 1) and / (1, -1).
+def _build_lines() -> List[List[Tuple[int, int]]]:
+    # Every maximal row, column and diagonal, including short diagonals,
+    # so each cell lies on exactly four lines.
+    lines = []
+    for r in range(10):
+        lines.append([(r, c) for c in range(10)])
+    for c in range(10):
+        lines.append([(r, c) for r in range(10)])
+    for dc, starts in [(1, [(0, c) for c in range(10)] + [(r, 0) for r in range(1, 10)]),
+                       (-1, [(0, c) for c in range(10)] + [(r, 9) for r in range(1, 10)])]:
+        for sr, sc in starts:
+            line = []
+            r, c = sr, sc
+            while 0 <= r < 10 and 0 <= c < 10:
+                line.append((r, c))
+                r += 1
+                c += dc
+            lines.append(line)
+    return lines
 
-    def is_corner(self, r: int, c: int) -> bool:
-        return (r == 0 or r == self.rows - 1) and (c == 0 or c == self.cols - 1)
+LINES: List[List[Tuple[int, int]]] = _build_lines()
+
+# CELL_LINES[r][c] -> [(line index, position of the cell in that line), ...]
+CELL_LINES: List[List[List[Tuple[int, int]]]] = [[[] for _ in range(10)] for _ in range(10)]
+
+# WINDOWS: all 192 five-cell windows. LINE_WINDOWS[line] lists a line's windows
+# in order, so window k of a line starts at position k.
+# WINDOW_PLAYABLE[w] drops corners, which count for every team.
+# CELL_WINDOWS[r][c] -> indices of the (at most 20) windows through the cell.
+WINDOWS: List[Tuple[Tuple[int, int], ...]] = []
+LINE_WINDOWS: List[List[int]] = []
+WINDOW_PLAYABLE: List[Tuple[Tuple[int, int], ...]] = []
+CELL_WINDOWS: List[List[List[int]]] = [[[] for _ in range(10)] for _ in range(10)]
+
+for _line_idx, _line in enumerate(LINES):
+    for _pos, (_r, _c) in enumerate(_line):
+        CELL_LINES[_r][_c].append((_line_idx, _pos))
+    _line_windows = []
+    for _start in range(len(_line) - 4):
+        _window = tuple(_line[_start:_start + 5])
+        _line_windows.append(len(WINDOWS))
+        for _r, _c in _window:
+            CELL_WINDOWS[_r][_c].append(len(WINDOWS))
+        WINDOWS.append(_window)
+        WINDOW_PLAYABLE.append(tuple(cell for cell in _window if cell not in CORNERS))
+    LINE_WINDOWS.append(_line_windows)
+
+class Layout:
+    """Immutable card layout: grid, card id -> cells, and card id per cell.
 
-    def _register_card(self, r: int, c: int, card: Optional[Card]):
+    Built once per layout (see get_layout) and shared by every board using it;
+    only chips and locks are allocated per game.
+    """
+    def __init__(self):
+        self.grid: List[List[Optional[Card]]] = [[None for _ in range(10)] for _ in range(10)]
+        # Card id -> cells showing that card
+        self.card_positions: Dict[int, List[Tuple[int, int]]] = {}
+        # Card id on each cell index r * 10 + c, -1 on corners
+        self.cell_cards: List[int] = [-1] * 100
+        self.corners = CORNERS
+
+    def _register_card(self, r: int, c: int, card: Card):
         self.grid[r][c] = card
-        if card:
-            # We use repr() or str() for the key
-            key = str(card)
-            if key not in self.card_positions:
-                self.card_positions[key] = []
-            self.card_positions[key].append((r, c))
-
-    def _generate_standard_layout(self):
+        self.cell_cards[r * 10 + c] = card.id
+        if card.id not in self.card_positions:
+            self.card_positions[card.id] = []
+        self.card_positions[card.id].append((r, c))
+
+    @classmethod
+    def standard(cls) -> "Layout":
+        layout = cls()
         # Create deck order for spiral: Spades, Diamonds, Clubs, Hearts (Standard-ish)
         cards = []
         for suit in [Suit.SPADES, Suit.DIAMONDS, Suit.CLUBS, Suit.HEARTS]:
@@ -56,13 +104,11 @@ class Board:
         for _ in range(100):
             visited[r][c] = True
             
-            # If not corner, place card
-            if not self.is_corner(r, c):
+            # If not corner, place card (corners stay None)
+            if (r, c) not in CORNERS:
                 if card_idx < len(full_deck):
-                    self._register_card(r, c, full_deck[card_idx])
+                    layout._register_card(r, c, full_deck[card_idx])
                     card_idx += 1
-            else:
-                self.grid[r][c] = None # Explicitly None for corners relative to cards
             
             # Next step
             vr = r + directions[direction_idx][0]
@@ -75,8 +121,11 @@ class Board:
                 direction_idx = (direction_idx + 1) % 4
                 r += directions[direction_idx][0]
                 c += directions[direction_idx][1]
+        return layout
 
-    def _generate_random_layout(self):
+    @classmethod
+    def shuffled(cls, rng: random.Random) -> "Layout":
+        layout = cls()
         deck_cards = []
         for suit in Suit:
             for rank in Rank:
@@ -85,24 +134,187 @@ class Board:
                 deck_cards.append(Card(rank, suit))
                 deck_cards.append(Card(rank, suit))
         
-        self.rng.shuffle(deck_cards)
-        
-        # Reset
-        self.grid = [[None]*10 for _ in range(10)]
-        self.card_positions = {}
+        rng.shuffle(deck_cards)
         
         card_idx = 0
         for r in range(10):
             for c in range(10):
-                if self.is_corner(r, c):
+                if (r, c) in CORNERS:
                     continue
                 
                 if card_idx < len(deck_cards):
-                    self._register_card(r, c, deck_cards[card_idx])
+                    layout._register_card(r, c, deck_cards[card_idx])
                     card_idx += 1
+        return layout
+
+_STANDARD_LAYOUT: Optional[Layout] = None
+# Seed (or rng state) before shuffling -> (layout, rng state after), so a cached
+# random layout leaves the game RNG exactly where building it would have
+_RANDOM_LAYOUTS: "OrderedDict[object, Tuple[Layout, tuple]]" = OrderedDict()
+_RANDOM_LAYOUTS_MAX = 256
+
+def get_layout(layout_type: str, rng: random.Random, seed: Optional[int] = None) -> Layout:
+    """Shared Layout for layout_type; "random" layouts are drawn from rng.
+
+    Random layouts are cached per seed, which must be the seed rng was just
+    created from, or per rng state when no seed is given.
+    """
+    global _STANDARD_LAYOUT
+    if layout_type != "random":
+        if _STANDARD_LAYOUT is None:
+            _STANDARD_LAYOUT = Layout.standard()
+        return _STANDARD_LAYOUT
+    key = ("seed", seed) if seed is not None else rng.getstate()
+    cached = _RANDOM_LAYOUTS.get(key)
+    if cached is not None:
+        _RANDOM_LAYOUTS.move_to_end(key)
+        layout, after = cached
+        rng.setstate(after)
+        return layout
+    layout = Layout.shuffled(rng)
+    _RANDOM_LAYOUTS[key] = (layout, rng.getstate())
+    if len(_RANDOM_LAYOUTS) > _RANDOM_LAYOUTS_MAX:
+        _RANDOM_LAYOUTS.popitem(last=False)
+    return layout
+
+class Board:
+    def __init__(self, rng: random.Random, layout_type: str = "standard", seed: Optional[int] = None):
+        self.rows = 10
+        self.cols = 10
+        self.rng = rng
+        # Layout data is shared, never mutate it
+        self.layout = get_layout(layout_type, rng, seed)
+        self.grid = self.layout.grid
+        self.card_positions = self.layout.card_positions
+        self._init_chips()
+
+    def _init_chips(self):
+        # Mutable per-game state. Subclasses swap this for a different storage.
+        self.state: List[List[Optional[int]]] = [[None for _ in range(self.cols)] for _ in range(self.rows)]
+        self.locked: List[List[bool]] = [[False for _ in range(self.cols)] for _ in range(self.rows)]
+        # Zobrist hash of chips and locks, kept up to date by every mutator
+        self._hash = 0
+
+    @property
+    def zobrist_hash(self) -> int:
+        return self._hash
+
+    def is_corner(self, r: int, c: int) -> bool:
+        return (r == 0 or r == self.rows - 1) and (c == 0 or c == self.cols - 1)
 
     def place_chip(self, r: int, c: int, team_id: int):
+        prev = self.state[r][c]
+        if prev is not None:
+            self._hash ^= CHIP_KEYS[prev][r * 10 + c]
         self.state[r][c] = team_id
+        self._hash ^= CHIP_KEYS[team_id][r * 10 + c]
 
     def remove_chip(self, r: int, c: int):
+        prev = self.state[r][c]
+        if prev is not None:
+            self._hash ^= CHIP_KEYS[prev][r * 10 + c]
         self.state[r][c] = None
+
+    def get_chip(self, r: int, c: int) -> Optional[int]:
+        return self.state[r][c]
+
+    def is_locked(self, r: int, c: int) -> bool:
+        return self.locked[r][c]
+
+    def lock_cell(self, r: int, c: int):
+        if not self.locked[r][c]:
+            self._hash ^= LOCK_KEYS[r * 10 + c]
+        self.locked[r][c] = True
+
+    def unlock_cell(self, r: int, c: int):
+        if self.locked[r][c]:
+            self._hash ^= LOCK_KEYS[r * 10 + c]
+        self.locked[r][c] = False
+
+    def empty_cells(self) -> List[Tuple[int, int]]:
+        """Non-corner cells without a chip, in row-major order."""
+        return [(r, c) for r in range(self.rows) for c in range(self.cols)
+                if self.state[r][c] is None and not self.is_corner(r, c)]
+
+    def removable_cells(self, team_id: int) -> List[Tuple[int, int]]:
+        """Unlocked chips of other teams (one-eyed jack targets), in row-major order."""
+        cells = []
+        for r in range(self.rows):
+            for c in range(self.cols):
+                val = self.state[r][c]
+                if val is not None and val != team_id and not self.locked[r][c]:
+                    cells.append((r, c))
+        return cells
+
+    def copy(self) -> "Board":
+        """Copy of the chip/lock state. Layout data (layout, grid, card_positions) is shared."""
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.state = [row[:] for row in self.state]
+        clone.locked = [row[:] for row in self.locked]
+        return clone
+
+    def snapshot(self) -> tuple:
+        """Chips, locks and hash as immutable tuples, for restore()."""
+        return tuple(map(tuple, self.state)), tuple(map(tuple, self.locked)), self._hash
+
+    def restore(self, snap: tuple):
+        state, locked, self._hash = snap
+        self.state = [list(row) for row in state]
+        self.locked = [list(row) for row in locked]
+
+    def count_sequences(self, team_id: int) -> int:
+        return count_sequences(self, team_id)
+
+    def window_complete(self, w: int, team_id: int) -> bool:
+        """True if every non-corner cell of WINDOWS[w] holds a team_id chip."""
+        state = self.state
+        for r, c in WINDOW_PLAYABLE[w]:
+            if state[r][c] != team_id:
+                return False
+        return True
+
+    def line_sequences(self, line: List[Tuple[int, int]], team_id: int) -> int:
+        """Sequences for team_id along one line: each run of team/corner cells gives len // 5."""
+        total = 0
+        run = 0
+        for r, c in line:
+            if self.get_chip(r, c) == team_id or self.is_corner(r, c):
+                run += 1
+            else:
+                total += run // 5
+                run = 0
+        return total + run // 5
+
+    def lock_sequences(self, team_id: int):
+        """Lock every non-corner cell that is part of a complete 5-line for team_id."""
+        for w in range(len(WINDOWS)):
+            if self.window_complete(w, team_id):
+                for r, c in WINDOW_PLAYABLE[w]:
+                    self.lock_cell(r, c)
+
+
+def count_sequences(board, team_id: int) -> int:
+    """Counts sequences for team_id on anything exposing .state.
+
+    Each maximal run of team/corner cells along a line contributes len // 5,
+    i.e. complete windows are taken greedily without overlap along each line.
+    """
+    state = board.state
+    total_seq = 0
+    for line_windows in LINE_WINDOWS:
+        k = 0
+        n = len(line_windows)
+        while k < n:
+            window = WINDOWS[line_windows[k]]
+            # Check from the far end: a miss at position j rules out the
+            # next j windows along this line as well.
+            for j in range(4, -1, -1):
+                r, c = window[j]
+                if state[r][c] != team_id and (r, c) not in CORNERS:
+                    k += j + 1
+                    break
+            else:
+                total_seq += 1
+                k += 5
+    return total_seq
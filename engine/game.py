@@ -1,23 +1,63 @@
-from typing import List, Tuple, Dict, Optional
+from array import array
+from typing import List, Tuple, Dict, Optional, Set
 from .models import Card, Deck, Player, BoardState, Rank, Suit
-from .board import Board
+from .board import Board, count_sequences, LINES, CELL_LINES, CELL_WINDOWS, WINDOW_PLAYABLE
+from .bitboard import BitBoard
+from .zobrist import TURN_KEYS, MAX_TEAMS
+from .game_log import GameLog, PLACE, REMOVE, DEAD_CARD
 
 import random
 
+# Board storage backends selectable per game. Both expose the same API.
+BOARD_BACKENDS = {
+    "list": Board,
+    "bitboard": BitBoard,
+}
+
+class GameSnapshot:
+    """Mutable state of a SequenceGame at one point, from SequenceGame.snapshot().
+
+    Everything is held in immutable form (tuples, bytes), so one snapshot can
+    be restored any number of times. Layout data is not included.
+    """
+    __slots__ = ("board", "deck", "hands", "turn", "winner", "rng_state", "line_counts",
+                 "sequence_counts", "locked_cells", "log")
+
+def check_team_id(team_id: int):
+    if not 0 <= team_id < MAX_TEAMS:
+        raise ValueError(f"team_id must be between 0 and {MAX_TEAMS - 1}, got {team_id}")
+
 class SequenceGame:
-    def __init__(self, num_players: int = 2, board_type: str = "standard", teams: bool = True, seed: Optional[int] = None):
+    def __init__(self, num_players: int = 2, board_type: str = "standard", teams: bool = True, seed: Optional[int] = None,
+                 board_backend: str = "list", incremental: bool = True, log_events: bool = True):
         if seed is None:
             seed = random.randint(0, 999999)
         self.seed = seed
         self.rng = random.Random(seed)
         
+        if board_backend not in BOARD_BACKENDS:
+            raise ValueError(f"Unknown board backend: {board_backend}")
+        if not 1 <= num_players <= MAX_TEAMS:
+            raise ValueError(f"num_players must be between 1 and {MAX_TEAMS}")
         self.num_players = num_players
-        self.board = Board(self.rng, layout_type=board_type)
+        self.board = BOARD_BACKENDS[board_backend](self.rng, layout_type=board_type, seed=seed)
         self.deck = Deck(self.rng)
         self.players: List[Player] = []
         self.current_turn_index = 0
-        self.log: List[dict] = []
+        # With log_events=False only the log's counters are kept (for simulations)
+        self.log = GameLog(enabled=log_events)
         self.winner: Optional[int] = None # Team ID
+        # Bumped on every change to the visible state (moves, dead cards, restore)
+        self.version = 0
+
+        # Incremental sequence tracking: only lines through the changed cell are
+        # re-evaluated after a move. Per-team tables are built lazily on first use.
+        self.incremental = incremental
+        self._line_counts: Dict[int, List[int]] = {}
+        self._sequence_counts: Dict[int, int] = {}
+        self.locked_cells: Dict[int, Set[Tuple[int, int]]] = {}
+        # Undo records for make_move / unmake_move
+        self._undo_stack: List[tuple] = []
 
         self.teams_mode = teams
         for i in range(num_players):
@@ -46,6 +86,11 @@ class SequenceGame:
     def current_player(self) -> Player:
         return self.players[self.current_turn_index]
 
+    @property
+    def position_hash(self) -> int:
+        """Zobrist hash of chips, locks and side to move. Stable across processes."""
+        return self.board.zobrist_hash ^ TURN_KEYS[self.current_turn_index]
+
     def get_valid_moves(self, card_index: int) -> List[Tuple[int, int]]:
         player = self.current_player
         if card_index >= len(player.hand):
@@ -55,40 +100,35 @@ class SequenceGame:
         moves = []
         
         if card.is_two_eyed_jack:
-            for r in range(10):
-                for c in range(10):
-                    if not self.board.is_corner(r, c) and self.board.state[r][c] is None:
-                        moves.append((r, c))
+            moves = self.board.empty_cells()
         elif card.is_one_eyed_jack:
-            for r in range(10):
-                for c in range(10):
-                    curr_team = self.board.state[r][c]
-                    if curr_team is not None and curr_team != player.team_id:
-                        if not self.board.locked[r][c]:
-                            moves.append((r, c))
+            moves = self.board.removable_cells(player.team_id)
         else:
-            key = str(card)
-            possible_locs = self.board.card_positions.get(key, [])
+            possible_locs = self.board.card_positions.get(card.id, [])
             for r, c in possible_locs:
-                if self.board.state[r][c] is None:
+                if self.board.get_chip(r, c) is None:
                     moves.append((r, c))
         
         return moves
         
+    def holds_card_for(self, player: Player, r: int, c: int) -> bool:
+        """True if player holds the card printed on (r, c); O(1), jacks are not considered."""
+        card_id = self.board.layout.cell_cards[r * 10 + c]
+        return card_id >= 0 and player.hand.holds(card_id)
+
     def find_dead_card(self, player_idx: int) -> Optional[int]:
         player = self.players[player_idx]
         for i, card in enumerate(player.hand):
-            if card.rank == Rank.JACK:
+            if card.is_jack:
                 continue
             
-            key = str(card)
-            locs = self.board.card_positions.get(key, [])
+            locs = self.board.card_positions.get(card.id, [])
             if not locs:
                 continue
                 
             occupied_count = 0
             for r, c in locs:
-                if self.board.state[r][c] is not None:
+                if self.board.get_chip(r, c) is not None:
                     occupied_count += 1
             
             if occupied_count == len(locs):
@@ -102,39 +142,40 @@ class SequenceGame:
             new_card = self.deck.draw()
             if new_card:
                 player.hand.append(new_card)
-            self.log.append({
-                "turn": self.current_turn_index,
-                "player": player.id,
-                "action": "dead_card",
-                "card": str(old_card)
-            })
+            self.log.record(DEAD_CARD, player.id, player.team_id, old_card.id)
+            self.version += 1
 
     def play_move(self, card_index: int, target: Tuple[int, int]):
         player = self.current_player
         if not (0 <= card_index < len(player.hand)):
             return False
             
+        # Zobrist keys exist for team ids 0..MAX_TEAMS-1 only
+        check_team_id(player.team_id)
         card = player.hand[card_index]
         r, c = target
         
         valid = False
         action_type = "place"
         
+        chip = self.board.get_chip(r, c)
+        changed_team = player.team_id
         if card.is_two_eyed_jack:
-            if self.board.state[r][c] is None and not self.board.is_corner(r,c):
+            if chip is None and not self.board.is_corner(r,c):
                 self.board.place_chip(r, c, player.team_id)
                 valid = True
         elif card.is_one_eyed_jack:
-            if self.board.state[r][c] is not None and \
-               self.board.state[r][c] != player.team_id and \
-               not self.board.locked[r][c]:
+            if chip is not None and \
+               chip != player.team_id and \
+               not self.board.is_locked(r, c):
                 self.board.remove_chip(r, c)
                 valid = True
                 action_type = "remove"
+                changed_team = chip
         else:
             target_card = self.board.grid[r][c]
-            # Strict string matching or card equality
-            if str(target_card) == str(card) and self.board.state[r][c] is None:
+            # Cards are interned, so the layout holds the very same object
+            if target_card is card and chip is None:
                 self.board.place_chip(r, c, player.team_id)
                 valid = True
 
@@ -144,146 +185,185 @@ class SequenceGame:
             if new_card:
                 player.hand.append(new_card)
             
-            self.log.append({
-                "player": player.id,
-                "team": player.team_id,
-                "card": str(card),
-                "action": action_type,
-                "target": target
-            })
+            self.log.record(REMOVE if action_type == "remove" else PLACE, player.id, player.team_id,
+                            card.id, r, c)
             
-            self.check_sequences_and_lock(player.team_id)
+            if self.incremental:
+                self._update_line_counts(r, c, changed_team)
+                if action_type == "place":
+                    self._lock_windows_through(r, c, player.team_id)
+            else:
+                self.check_sequences_and_lock(player.team_id)
             
             if self.check_win(player.team_id):
                 self.winner = player.team_id
             
             self.current_turn_index = (self.current_turn_index + 1) % self.num_players
+            self.version += 1
             return True
         return False
 
     def check_sequences_and_lock(self, team_id: int):
         # Identify NEW sequences and lock them
-        # Just scan all sequences for this team
-        
-        rows, cols = 10, 10
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        
-        captured_groups = []
-        
-        for r in range(rows):
-            for c in range(cols):
-                for dr, dc in directions:
-                    line = []
-                    valid = True
-                    for k in range(5):
-                        nr, nc = r + k*dr, c + k*dc
-                        if not (0 <= nr < rows and 0 <= nc < cols):
-                            valid = False
-                            break
-                        
-                        val = self.board.state[nr][nc]
-                        if not (val == team_id or self.board.is_corner(nr, nc)):
-                            valid = False
-                            break
-                        line.append((nr, nc))
-                    
-                    if valid:
-                        captured_groups.append(line)
-                        
-        # Lock them
-        for group in captured_groups:
-            for rr, cc in group:
-                if not self.board.is_corner(rr, cc):
-                    self.board.locked[rr][cc] = True
+        self.board.lock_sequences(team_id)
 
     def check_win(self, team_id: int) -> bool:
         required = 2 if self.teams_mode and self.num_players % 2 == 0 else 1
         if self.num_players == 3: required = 1
         
-        # Use static helper
-        count = SequenceGame.count_sequences_on_board(self.board, team_id)
+        count = self.sequence_count(team_id)
         return count >= required
 
+    def sequence_count(self, team_id: int) -> int:
+        if not self.incremental:
+            return self.board.count_sequences(team_id)
+        self._team_line_counts(team_id)
+        return self._sequence_counts[team_id]
+
+    def _team_line_counts(self, team_id: int) -> List[int]:
+        counts = self._line_counts.get(team_id)
+        if counts is None:
+            counts = [self.board.line_sequences(line, team_id) for line in LINES]
+            self._line_counts[team_id] = counts
+            self._sequence_counts[team_id] = sum(counts)
+        return counts
+
+    def _update_line_counts(self, r: int, c: int, team_id: int) -> List[Tuple[int, int]]:
+        # Only the 4 lines through (r, c) can change for team_id.
+        # Returns the previous (line index, count) pairs for undo.
+        counts = self._team_line_counts(team_id)
+        saved = []
+        delta = 0
+        for line_idx, _ in CELL_LINES[r][c]:
+            old = counts[line_idx]
+            new = self.board.line_sequences(LINES[line_idx], team_id)
+            saved.append((line_idx, old))
+            delta += new - old
+            counts[line_idx] = new
+        self._sequence_counts[team_id] += delta
+        return saved
+
+    def _lock_windows_through(self, r: int, c: int, team_id: int) -> List[Tuple[int, int]]:
+        # A team's window can only complete on its own placement, so checking
+        # the windows through the placed cell finds every new sequence.
+        # Returns the cells that were not locked before, for undo.
+        board = self.board
+        newly_locked = []
+        for w in CELL_WINDOWS[r][c]:
+            if board.window_complete(w, team_id):
+                locked = self.locked_cells.setdefault(team_id, set())
+                for wr, wc in WINDOW_PLAYABLE[w]:
+                    if not board.is_locked(wr, wc):
+                        board.lock_cell(wr, wc)
+                        newly_locked.append((wr, wc))
+                        locked.add((wr, wc))
+        return newly_locked
+
+    def make_move(self, target: Tuple[int, int], team_id: int, remove: bool = False):
+        """Applies a hypothetical placement (or removal) in place for search code.
+
+        Locks and sequence counters are updated as for a real move; hands, deck,
+        log, winner and turn are left alone. Every call must be paired with
+        unmake_move(), which restores the previous state exactly.
+        """
+        check_team_id(team_id)
+        r, c = target
+        prev = self.board.get_chip(r, c)
+        changed_teams = [] if prev is None else [prev]
+        if not remove and team_id != prev:
+            changed_teams.append(team_id)
+        prev_totals = []
+        if self.incremental:
+            for team in changed_teams:
+                # Build lazily-created tables before the board changes
+                self._team_line_counts(team)
+                prev_totals.append(self._sequence_counts[team])
+
+        if remove:
+            self.board.remove_chip(r, c)
+        else:
+            self.board.place_chip(r, c, team_id)
+
+        saved = []
+        if self.incremental:
+            for team, prev_total in zip(changed_teams, prev_totals):
+                saved.append((team, self._update_line_counts(r, c, team), prev_total))
+        newly_locked = [] if remove else self._lock_windows_through(r, c, team_id)
+        self._undo_stack.append((r, c, prev, saved, newly_locked))
+
+    def unmake_move(self):
+        """Reverts the most recent make_move()."""
+        r, c, prev, saved, newly_locked = self._undo_stack.pop()
+        for lr, lc in newly_locked:
+            self.board.unlock_cell(lr, lc)
+            for cells in self.locked_cells.values():
+                cells.discard((lr, lc))
+        if prev is None:
+            self.board.remove_chip(r, c)
+        else:
+            self.board.place_chip(r, c, prev)
+        for team, saved_lines, prev_total in saved:
+            counts = self._line_counts[team]
+            for line_idx, old in saved_lines:
+                counts[line_idx] = old
+            self._sequence_counts[team] = prev_total
+
+    def snapshot(self) -> GameSnapshot:
+        """Captures chips, locks, hands, deck order, turn, winner, RNG state, counters and the log."""
+        if self._undo_stack:
+            raise RuntimeError("Cannot snapshot in the middle of make_move/unmake_move")
+        snap = GameSnapshot()
+        snap.board = self.board.snapshot()
+        snap.deck = bytes(self.deck.ids)
+        snap.hands = tuple(bytes(p.hand.ids) for p in self.players)
+        snap.turn = self.current_turn_index
+        snap.winner = self.winner
+        snap.rng_state = self.rng.getstate()
+        snap.line_counts = {team: tuple(counts) for team, counts in self._line_counts.items()}
+        snap.sequence_counts = dict(self._sequence_counts)
+        snap.locked_cells = {team: frozenset(cells) for team, cells in self.locked_cells.items()}
+        snap.log = self.log.snapshot()
+        return snap
+
+    def restore(self, snap: GameSnapshot):
+        """Returns the game to a snapshot taken from it (or from a clone of it)."""
+        self.board.restore(snap.board)
+        self.deck.ids = array("b", snap.deck)
+        for player, hand in zip(self.players, snap.hands):
+            player.hand.set_ids(hand)
+        self.current_turn_index = snap.turn
+        self.winner = snap.winner
+        self.rng.setstate(snap.rng_state)
+        self._line_counts = {team: list(counts) for team, counts in snap.line_counts.items()}
+        self._sequence_counts = dict(snap.sequence_counts)
+        self.locked_cells = {team: set(cells) for team, cells in snap.locked_cells.items()}
+        self.log.restore(snap.log)
+        self._undo_stack = []
+        self.version += 1
+
+    def clone(self) -> "SequenceGame":
+        """Independent copy that shares only the immutable layout; much cheaper than deepcopy."""
+        if self._undo_stack:
+            raise RuntimeError("Cannot clone in the middle of make_move/unmake_move")
+        clone = object.__new__(SequenceGame)
+        clone.__dict__.update(self.__dict__)
+        clone.rng = random.Random()
+        clone.rng.setstate(self.rng.getstate())
+        clone.board = self.board.copy()
+        clone.board.rng = clone.rng
+        clone.deck = self.deck.copy(clone.rng)
+        clone.players = [Player(id=p.id, team_id=p.team_id, hand=p.hand.copy(), is_bot=p.is_bot,
+                                strategy=p.strategy) for p in self.players]
+        clone.log = self.log.copy()
+        clone._line_counts = {team: counts[:] for team, counts in self._line_counts.items()}
+        clone._sequence_counts = dict(self._sequence_counts)
+        clone.locked_cells = {team: set(cells) for team, cells in self.locked_cells.items()}
+        clone._undo_stack = []
+        return clone
+
     @staticmethod
     def count_sequences_on_board(board, team_id: int) -> int:
-        rows = 10
-        cols = 10
-        total_seq = 0
-        
-        def scan_dir(dr, dc):
-            c_seq = 0
-            # Broad scan: iterate all valid start lines for this direction
-            # This is slightly inefficient but safe
-            # Map all cells to "lines"
-            
-            # Horizontal
-            if dr == 0:
-                for r in range(rows):
-                    consecutive = 0
-                    for c in range(cols):
-                        val = board.state[r][c]
-                        if val == team_id or board.is_corner(r, c):
-                            consecutive += 1
-                        else:
-                            c_seq += (consecutive // 5)
-                            consecutive = 0
-                    c_seq += (consecutive // 5)
-            # Vertical
-            elif dc == 0:
-                for c in range(cols):
-                    consecutive = 0
-                    for r in range(rows):
-                        val = board.state[r][c]
-                        if val == team_id or board.is_corner(r, c):
-                            consecutive += 1
-                        else:
-                            c_seq += (consecutive // 5)
-                            consecutive = 0
-                    c_seq += (consecutive // 5)
-            else:
-                # Diagonal
-                # Scan all diagonals
-                # There are diagonals starting at (0,0)..(0,9) and (1,0)..(9,0)
-                
-                # Setup Starts
-                starts = []
-                # Top row
-                for c in range(cols): starts.append((0, c))
-                # Left col (exclude 0,0)
-                for r in range(1, rows): starts.append((r, 0))
-                # Right col for / diag
-                for r in range(1, rows): starts.append((r, cols-1))
-                
-                # Filter useful starts based on dr, dc
-                # For \ (1, 1): Start Top or Left
-                # For / (1, -1): Start Top or Right
-                
-                valid_starts = []
-                if dc == 1: # \
-                    for c in range(cols): valid_starts.append((0, c))
-                    for r in range(1, rows): valid_starts.append((r, 0))
-                else: # /
-                    for c in range(cols): valid_starts.append((0, c))
-                    for r in range(1, rows): valid_starts.append((r, cols-1))
-                
-                for sr, sc in valid_starts:
-                    consecutive = 0
-                    r, c = sr, sc
-                    while 0 <= r < rows and 0 <= c < cols:
-                        val = board.state[r][c]
-                        if val == team_id or board.is_corner(r, c):
-                            consecutive += 1
-                        else:
-                            c_seq += (consecutive // 5)
-                            consecutive = 0
-                        r += dr
-                        c += dc
-                    c_seq += (consecutive // 5)
-            return c_seq
-
-        total_seq += scan_dir(0, 1) # H
-        total_seq += scan_dir(1, 0) # V
-        total_seq += scan_dir(1, 1) # \
-        total_seq += scan_dir(1, -1) # /
-        
-        return total_seq
+        if hasattr(board, "count_sequences"):
+            return board.count_sequences(team_id)
+        # Duck-typed boards (anything with .state)
+        return count_sequences(board, team_id)
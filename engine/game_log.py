@@ -0,0 +1,109 @@
+from array import array
+from typing import Iterator, List, Union
+
+from .models import CARDS
+
+# Action codes stored per event
+PLACE = 0
+REMOVE = 1
+DEAD_CARD = 2
+ACTION_NAMES = ["place", "remove", "dead_card"]
+COLUMNS = ("actions", "players", "teams", "cards", "rows", "cols")
+
+class GameLog:
+    """Compact, column-oriented event log for a SequenceGame.
+
+    Each event is one entry in small typed arrays (action code, player, team,
+    card code, r, c) instead of a dict. Indexing or iterating yields the same
+    dicts SequenceGame used to append, built on demand. With enabled=False no
+    events are kept, but the per-game counters (jacks played, dead cards) are
+    still exact.
+    """
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.actions = array("b")
+        self.players = array("b")
+        self.teams = array("b")
+        self.cards = array("b")
+        self.rows = array("b")
+        self.cols = array("b")
+        self.moves = 0
+        self.two_eyed_jacks = 0
+        self.one_eyed_jacks = 0
+        self.dead_cards = 0
+        # Bumped on every restore, so readers can tell a rewritten history from appends
+        self.generation = 0
+
+    def record(self, action: int, player: int, team: int, card: int, r: int = -1, c: int = -1):
+        if action == DEAD_CARD:
+            self.dead_cards += 1
+        else:
+            self.moves += 1
+            if CARDS[card].is_two_eyed_jack:
+                self.two_eyed_jacks += 1
+            elif CARDS[card].is_one_eyed_jack:
+                self.one_eyed_jacks += 1
+        if not self.enabled:
+            return
+        self.actions.append(action)
+        self.players.append(player)
+        self.teams.append(team)
+        self.cards.append(card)
+        self.rows.append(r)
+        self.cols.append(c)
+
+    def copy(self) -> "GameLog":
+        clone = GameLog.__new__(GameLog)
+        clone.__dict__.update(self.__dict__)
+        for name in COLUMNS:
+            setattr(clone, name, array("b", getattr(self, name)))
+        return clone
+
+    def snapshot(self) -> tuple:
+        """Event arrays (as bytes) and counters; restoring works in any order, across branches."""
+        arrays = tuple(bytes(getattr(self, name)) for name in COLUMNS)
+        return arrays, self.moves, self.two_eyed_jacks, self.one_eyed_jacks, self.dead_cards
+
+    def restore(self, snap: tuple):
+        arrays, self.moves, self.two_eyed_jacks, self.one_eyed_jacks, self.dead_cards = snap
+        for name, data in zip(COLUMNS, arrays):
+            setattr(self, name, array("b", data))
+        self.generation += 1
+
+    def entry(self, i: int) -> dict:
+        """Event i as the dict SequenceGame.log used to hold."""
+        action = self.actions[i]
+        label = CARDS[self.cards[i]].label
+        if action == DEAD_CARD:
+            return {"turn": self.players[i], "player": self.players[i], "action": "dead_card", "card": label}
+        return {
+            "player": self.players[i],
+            "team": self.teams[i],
+            "card": label,
+            "action": ACTION_NAMES[action],
+            "target": (self.rows[i], self.cols[i]),
+        }
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[dict, List[dict]]:
+        if isinstance(index, slice):
+            return [self.entry(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("log index out of range")
+        return self.entry(index)
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self)):
+            yield self.entry(i)
+
+    def stats(self) -> dict:
+        return {
+            "moves": self.moves,
+            "two_eyed_jacks": self.two_eyed_jacks,
+            "one_eyed_jacks": self.one_eyed_jacks,
+            "dead_cards": self.dead_cards,
+        }
@@ -0,0 +1,373 @@
+import atexit
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .models import CARDS, NUM_CARDS
+from .board import CELL_WINDOWS
+from .bitboard import CORNER_MASK, FULL_MASK, WINDOW_MASKS, count_sequences_mask, sequence_cells_mask
+
+# The rollout engine works on Card ids (suit index * 13 + rank index)
+TWO_EYED = frozenset(card.id for card in CARDS if card.is_two_eyed_jack)
+ONE_EYED = frozenset(card.id for card in CARDS if card.is_one_eyed_jack)
+
+Action = Tuple[int, int]  # (card code, cell index r * 10 + c)
+
+# Masks of the windows through each cell index, for a cheap "did this chip complete anything" test
+CELL_WINDOW_MASKS: List[List[int]] = [[WINDOW_MASKS[w] for w in CELL_WINDOWS[idx // 10][idx % 10]]
+                                      for idx in range(100)]
+
+@dataclass
+class MCTSConfig:
+    playouts: int = 1000
+    time_limit: Optional[float] = None  # seconds; stops early when reached
+    exploration: float = 0.7
+    max_rollout_plies: int = 200
+    workers: int = 1  # >1 runs root-parallel search on a persistent process pool
+
+class RolloutState:
+    """Lean game state for playouts: bitmask chips, card codes, no logging.
+
+    Follows SequenceGame rules: placement/removal, locking, drawing, dead card
+    replacement when a player has no move, and the win requirement. A player
+    with no move and no dead card ends the game without a winner (as the
+    simulation loop does).
+    """
+    __slots__ = ("team_masks", "occupied", "locked", "hands", "deck", "turn",
+                 "teams", "required", "positions", "winner", "stuck")
+
+    def copy(self) -> "RolloutState":
+        clone = RolloutState.__new__(RolloutState)
+        clone.team_masks = self.team_masks[:]
+        clone.occupied = self.occupied
+        clone.locked = self.locked
+        clone.hands = [hand[:] for hand in self.hands]
+        clone.deck = self.deck[:]
+        clone.turn = self.turn
+        clone.teams = self.teams
+        clone.required = self.required
+        clone.positions = self.positions
+        clone.winner = self.winner
+        clone.stuck = self.stuck
+        return clone
+
+    @property
+    def done(self) -> bool:
+        return self.winner is not None or self.stuck
+
+    def _targets(self, code: int, team: int) -> int:
+        if code in TWO_EYED:
+            return FULL_MASK & ~(self.occupied | CORNER_MASK)
+        if code in ONE_EYED:
+            return self.occupied & ~self.team_masks[team] & ~self.locked
+        return self.positions[code] & ~self.occupied
+
+    def _replace_dead_card(self) -> bool:
+        hand = self.hands[self.turn]
+        for i, code in enumerate(hand):
+            if code in TWO_EYED or code in ONE_EYED:
+                continue
+            locs = self.positions[code]
+            if locs and not locs & ~self.occupied:
+                hand.pop(i)
+                if self.deck:
+                    hand.append(self.deck.pop())
+                return True
+        return False
+
+    def legal_actions(self) -> List[Action]:
+        """Actions for the player to move, replacing dead cards first if needed."""
+        while True:
+            team = self.teams[self.turn]
+            actions = []
+            for code in set(self.hands[self.turn]):
+                targets = self._targets(code, team)
+                while targets:
+                    low = targets & -targets
+                    actions.append((code, low.bit_length() - 1))
+                    targets ^= low
+            if actions:
+                return actions
+            if not self._replace_dead_card():
+                self.stuck = True
+                return actions
+
+    def apply(self, action: Action):
+        code, idx = action
+        bit = 1 << idx
+        team = self.teams[self.turn]
+        hand = self.hands[self.turn]
+        hand.remove(code)
+        if code in ONE_EYED:
+            for t, mask in enumerate(self.team_masks):
+                if mask & bit:
+                    self.team_masks[t] = mask & ~bit
+            self.occupied &= ~bit
+        else:
+            x = self.team_masks[team] | bit
+            self.team_masks[team] = x
+            self.occupied |= bit
+            x |= CORNER_MASK
+            # Sequences can only appear in windows through the new chip
+            for mask in CELL_WINDOW_MASKS[idx]:
+                if x & mask == mask:
+                    self.locked |= sequence_cells_mask(x) & ~CORNER_MASK
+                    if count_sequences_mask(x) >= self.required:
+                        self.winner = team
+                    break
+        if self.deck:
+            hand.append(self.deck.pop())
+        self.turn = (self.turn + 1) % len(self.hands)
+
+    def random_action(self, rng: random.Random) -> Optional[Action]:
+        """Random card with a target (scanning on from a random slot), then a uniform random target."""
+        while True:
+            team = self.teams[self.turn]
+            hand = self.hands[self.turn]
+            n = len(hand)
+            start = int(rng.random() * n) if n else 0
+            for k in range(n):
+                code = hand[(start + k) % n]
+                targets = self._targets(code, team)
+                if targets:
+                    pick = int(rng.random() * targets.bit_count())
+                    for _ in range(pick):
+                        targets &= targets - 1
+                    low = targets & -targets
+                    return code, low.bit_length() - 1
+            if not self._replace_dead_card():
+                self.stuck = True
+                return None
+
+    def rollout(self, rng: random.Random, max_plies: int) -> Optional[int]:
+        for _ in range(max_plies):
+            if self.done:
+                break
+            action = self.random_action(rng)
+            if action is None:
+                break
+            self.apply(action)
+        return self.winner
+
+def required_sequences(game) -> int:
+    required = 2 if game.teams_mode and game.num_players % 2 == 0 else 1
+    if game.num_players == 3: required = 1
+    return required
+
+class InformationSet:
+    """What the player to move can see: board, own hand, hand sizes, played cards.
+
+    determinize() samples the hidden hands and deck order from the unseen cards.
+    """
+    def __init__(self, game, player):
+        board = game.board
+        n_teams = max(p.team_id for p in game.players) + 1
+        team_masks = [0] * n_teams
+        locked = 0
+        positions = [0] * NUM_CARDS
+        for r in range(10):
+            for c in range(10):
+                idx = r * 10 + c
+                chip = board.get_chip(r, c)
+                if chip is not None:
+                    team_masks[chip] |= 1 << idx
+                if board.is_locked(r, c):
+                    locked |= 1 << idx
+                card = board.grid[r][c]
+                if card is not None:
+                    positions[card.id] |= 1 << idx
+
+        base = RolloutState.__new__(RolloutState)
+        base.team_masks = team_masks
+        base.occupied = 0
+        for mask in team_masks:
+            base.occupied |= mask
+        base.locked = locked
+        base.hands = [[] for _ in game.players]
+        base.deck = []
+        base.turn = game.current_turn_index
+        base.teams = [p.team_id for p in game.players]
+        base.required = required_sequences(game)
+        base.positions = positions
+        base.winner = game.winner
+        base.stuck = False
+        self.base = base
+
+        self.player_index = game.players.index(player)
+        self.own_hand = [card.id for card in player.hand]
+        self.hand_sizes = [len(p.hand) for p in game.players]
+        self.deck_size = len(game.deck)
+
+        # Unseen = two full decks minus our hand minus every card already played
+        # (needs a game created with log_events=True)
+        counts = [2] * NUM_CARDS
+        for code in self.own_hand:
+            counts[code] -= 1
+        for code in game.log.cards:
+            counts[code] -= 1
+        self.unseen = [code for code in range(NUM_CARDS) for _ in range(max(counts[code], 0))]
+
+    def determinize(self, rng: random.Random) -> RolloutState:
+        state = self.base.copy()
+        pool = self.unseen[:]
+        rng.shuffle(pool)
+        for i, size in enumerate(self.hand_sizes):
+            if i == self.player_index:
+                state.hands[i] = self.own_hand[:]
+            else:
+                state.hands[i] = pool[:size]
+                del pool[:size]
+        state.deck = pool[:self.deck_size]
+        return state
+
+class Node:
+    __slots__ = ("team", "children", "visits", "reward", "avail")
+
+    def __init__(self, team: Optional[int]):
+        self.team = team  # team that made the move into this node
+        self.children: Dict[Action, "Node"] = {}
+        self.visits = 0
+        self.reward = 0.0
+        self.avail = 1
+
+    def ucb_child(self, actions: List[Action], exploration: float) -> Action:
+        best = None
+        best_score = -1.0
+        for action in actions:
+            child = self.children[action]
+            score = child.reward / child.visits + exploration * math.sqrt(math.log(child.avail) / child.visits)
+            if score > best_score:
+                best_score = score
+                best = action
+        return best
+
+def search(info: InformationSet, config: MCTSConfig, rng: random.Random,
+           should_stop: Optional[Callable[[], bool]] = None) -> Dict[Action, Tuple[int, float]]:
+    """Single-observer information set MCTS from the player to move.
+
+    Each playout samples hidden cards, walks the shared tree with UCB
+    (restricted to actions legal in that sample), expands one node and
+    finishes with a random rollout. Returns {root action: (visits, reward)}.
+    should_stop, if given, is polled like the deadline and ends the search early.
+    """
+    root = Node(None)
+    deadline = time.perf_counter() + config.time_limit if config.time_limit else None
+
+    for i in range(config.playouts):
+        if i % 16 == 0 and ((deadline is not None and time.perf_counter() >= deadline)
+                            or (should_stop is not None and should_stop())):
+            break
+        state = info.determinize(rng)
+        node = root
+        path = []
+        while not state.done:
+            actions = state.legal_actions()
+            if not actions:
+                break
+            for action in actions:
+                child = node.children.get(action)
+                if child is not None:
+                    child.avail += 1
+            untried = [a for a in actions if a not in node.children]
+            if untried:
+                action = rng.choice(untried)
+                node.children[action] = child = Node(state.teams[state.turn])
+                state.apply(action)
+                path.append(child)
+                break
+            action = node.ucb_child(actions, config.exploration)
+            state.apply(action)
+            node = node.children[action]
+            path.append(node)
+
+        winner = state.rollout(rng, config.max_rollout_plies)
+        for node in path:
+            node.visits += 1
+            if winner is None:
+                node.reward += 0.5
+            elif winner == node.team:
+                node.reward += 1.0
+
+    return {action: (child.visits, child.reward) for action, child in root.children.items()}
+
+# Persistent worker pool for root-parallel search, created on first use
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+def shutdown_pool():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+    _pool_workers = 0
+
+atexit.register(shutdown_pool)
+
+def _search_worker(info: InformationSet, config: MCTSConfig, seed: int) -> Dict[Action, Tuple[int, float]]:
+    return search(info, config, random.Random(seed))
+
+def merge_stats(results) -> Dict[Action, Tuple[int, float]]:
+    merged: Dict[Action, Tuple[int, float]] = {}
+    for stats in results:
+        for action, (visits, reward) in stats.items():
+            v, w = merged.get(action, (0, 0.0))
+            merged[action] = (v + visits, w + reward)
+    return merged
+
+def parallel_search(info: InformationSet, config: MCTSConfig, rng: random.Random,
+                    should_stop: Optional[Callable[[], bool]] = None) -> Dict[Action, Tuple[int, float]]:
+    """Root-parallel search: each worker grows its own tree from an independent
+    seed with a share of the playout budget; root visit statistics are summed.
+
+    Runs inline when config.workers <= 1, or if the pool has died. Pool
+    workers only see the time limit; should_stop is polled while waiting and
+    cancels the shares that have not started yet.
+    """
+    workers = config.workers
+    if workers <= 1:
+        return search(info, config, rng, should_stop)
+
+    share, extra = divmod(config.playouts, workers)
+    jobs = []
+    for i in range(workers):
+        playouts = share + (1 if i < extra else 0)
+        if playouts:
+            jobs.append((replace(config, playouts=playouts, workers=1), rng.getrandbits(64)))
+    try:
+        pool = get_pool(workers)
+        futures = [pool.submit(_search_worker, info, worker_config, seed) for worker_config, seed in jobs]
+        if should_stop is not None:
+            while wait(futures, timeout=0.05).not_done:
+                if should_stop():
+                    for f in futures:
+                        f.cancel()
+                    return {}
+        return merge_stats(f.result() for f in futures)
+    except BrokenProcessPool:
+        shutdown_pool()
+        return search(info, config, rng, should_stop)
+
+def best_action(stats: Dict[Action, Tuple[int, float]]) -> Optional[Action]:
+    if not stats:
+        return None
+    return max(stats, key=lambda a: (stats[a][0], stats[a][1]))
+
+def to_move(player, action: Action) -> Tuple[int, Tuple[int, int]]:
+    """Maps (card code, cell index) back to the engine's (card_index, (r, c))."""
+    code, idx = action
+    for i, card in enumerate(player.hand):
+        if card.id == code:
+            return i, divmod(idx, 10)
+    raise ValueError(f"Card {CARDS[code]} not in hand")
@@ -1,6 +1,7 @@
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Tuple, Optional, Dict, Set
+from typing import Iterable, Iterator, List, Tuple, Optional, Dict, Set, Union
 import random
 
 class Suit(str, Enum):
@@ -24,50 +25,186 @@ class Rank(str, Enum):
     KING = 'K'
     ACE = 'A'
 
-@dataclass(frozen=True)
+SUITS = list(Suit)
+RANKS = list(Rank)
+NUM_CARDS = len(SUITS) * len(RANKS)
+
+_INTERNED: Dict[Tuple[Rank, Suit], "Card"] = {}
+
+@dataclass(frozen=True, init=False)
 class Card:
+    """A playing card. There is one instance per (rank, suit), so cards can be
+    compared by identity; id (suit index * 13 + rank index, 0..51), label and
+    the jack flags are computed once. Plain strings ("2", "♥") are accepted
+    and converted to Rank/Suit."""
     rank: Rank
     suit: Suit
-    
+    id: int = field(compare=False, repr=False)
+    label: str = field(compare=False, repr=False)
+    is_jack: bool = field(compare=False, repr=False)
+    is_two_eyed_jack: bool = field(compare=False, repr=False)
+    is_one_eyed_jack: bool = field(compare=False, repr=False)
+
+    def __new__(cls, rank: Rank, suit: Suit):
+        card = _INTERNED.get((Rank(rank), Suit(suit)))
+        if card is None:
+            card = super().__new__(cls)
+        return card
+
+    def __init__(self, rank: Rank, suit: Suit):
+        # Called again on every Card(...) lookup; the shared instance is never rewritten
+        if "id" in self.__dict__:
+            return
+        rank, suit = Rank(rank), Suit(suit)
+        set_attr = object.__setattr__
+        set_attr(self, "rank", rank)
+        set_attr(self, "suit", suit)
+        set_attr(self, "id", SUITS.index(suit) * len(RANKS) + RANKS.index(rank))
+        set_attr(self, "label", f"{rank.value}{suit.value}")
+        set_attr(self, "is_jack", rank == Rank.JACK)
+        set_attr(self, "is_two_eyed_jack", self.is_jack and suit in [Suit.DIAMONDS, Suit.CLUBS])
+        set_attr(self, "is_one_eyed_jack", self.is_jack and suit in [Suit.HEARTS, Suit.SPADES])
+        _INTERNED[(rank, suit)] = self
+
     def __repr__(self):
-        return f"{self.rank.value}{self.suit.value}"
+        return self.label
 
-    @property
-    def is_two_eyed_jack(self):
-        return self.rank == Rank.JACK and self.suit in [Suit.DIAMONDS, Suit.CLUBS]
+    def __eq__(self, other):
+        if isinstance(other, Card):
+            return self.id == other.id
+        return NotImplemented
 
-    @property
-    def is_one_eyed_jack(self):
-        return self.rank == Rank.JACK and self.suit in [Suit.HEARTS, Suit.SPADES]
+    def __hash__(self):
+        return self.id
+
+    def __reduce__(self):
+        # Unpickle to the interned instance
+        return card_from_id, (self.id,)
+
+# Every card, indexed by id
+CARDS: List[Card] = [Card(rank, suit) for suit in SUITS for rank in RANKS]
+CARD_BY_LABEL: Dict[str, Card] = {card.label: card for card in CARDS}
+
+def card_from_id(card_id: int) -> Card:
+    return CARDS[card_id]
 
 class Deck:
+    """Draw pile stored as card ids; the top of the pile is the end."""
+    __slots__ = ("ids", "rng")
+
     def __init__(self, rng: random.Random):
-        self.cards: List[Card] = []
         self.rng = rng
         self._initialize_deck()
     
     def _initialize_deck(self):
-        # Two standard decks
-        for _ in range(2):
-            for suit in Suit:
-                for rank in Rank:
-                    self.cards.append(Card(rank, suit))
-        self.rng.shuffle(self.cards)
+        # Two standard decks (ids in CARDS order, so the shuffle matches a list of Cards)
+        self.ids = array("b", range(NUM_CARDS)) * 2
+        self.rng.shuffle(self.ids)
+
+    @property
+    def cards(self) -> List[Card]:
+        """Remaining cards, bottom first (a copy)."""
+        return [CARDS[card_id] for card_id in self.ids]
 
     def draw(self) -> Optional[Card]:
-        return self.cards.pop() if self.cards else None
+        return CARDS[self.ids.pop()] if self.ids else None
 
     def is_empty(self) -> bool:
-        return len(self.cards) == 0
+        return len(self.ids) == 0
+
+    def copy(self, rng: random.Random) -> "Deck":
+        clone = Deck.__new__(Deck)
+        clone.rng = rng
+        clone.ids = array("b", self.ids)
+        return clone
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+class Hand:
+    """A player's cards in hand order, stored as card ids.
+
+    Behaves like a list of Cards (indexing, iteration, len, pop, append) and
+    keeps a per-card-id count, so holds() and `card in hand` are O(1).
+    """
+    __slots__ = ("ids", "counts")
 
-@dataclass
+    def __init__(self, cards: Iterable[Card] = ()):
+        self.ids = array("b")
+        self.counts = array("B", bytes(NUM_CARDS))
+        for card in cards:
+            self.append(card)
+
+    def append(self, card: Card):
+        self.ids.append(card.id)
+        self.counts[card.id] += 1
+
+    def pop(self, index: int = -1) -> Card:
+        card_id = self.ids.pop(index)
+        self.counts[card_id] -= 1
+        return CARDS[card_id]
+
+    def remove(self, card: Card):
+        self.pop(self.ids.index(card.id))
+
+    def index(self, card: Card) -> int:
+        return self.ids.index(card.id)
+
+    def copy(self) -> "Hand":
+        clone = Hand.__new__(Hand)
+        clone.ids = array("b", self.ids)
+        clone.counts = array("B", self.counts)
+        return clone
+
+    def set_ids(self, ids: bytes):
+        """Replaces the contents with the given card ids (as from bytes(hand.ids))."""
+        self.ids = array("b", ids)
+        self.counts = array("B", bytes(NUM_CARDS))
+        for card_id in self.ids:
+            self.counts[card_id] += 1
+
+    def holds(self, card_id: int) -> bool:
+        return self.counts[card_id] > 0
+
+    def count(self, card: Card) -> int:
+        return self.counts[card.id]
+
+    def __contains__(self, card: Card) -> bool:
+        return isinstance(card, Card) and self.counts[card.id] > 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Card, List[Card]]:
+        if isinstance(index, slice):
+            return [CARDS[card_id] for card_id in self.ids[index]]
+        return CARDS[self.ids[index]]
+
+    def __iter__(self) -> Iterator[Card]:
+        return (CARDS[card_id] for card_id in self.ids)
+
+    def __eq__(self, other):
+        if isinstance(other, Hand):
+            return self.ids == other.ids
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+@dataclass(slots=True)
 class Player:
     id: int
     team_id: int
-    hand: List[Card]
+    hand: Hand
     is_bot: bool = False
     strategy: str = "simple"
 
+    def __post_init__(self):
+        if not isinstance(self.hand, Hand):
+            self.hand = Hand(self.hand)
+
 class BoardState(Enum):
     EMPTY = 0
     OCCUPIED_P1 = 1 # We might trace team ID instead
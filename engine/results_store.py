@@ -0,0 +1,127 @@
+# On-disk, columnar store for simulation results.
+# Each batch is written as Parquet files under <root>/batch_id=<id>/ (hive
+# partitioning), so many runs can be queried or aggregated together with
+# pyarrow.dataset without loading everything into memory.
+import json
+import os
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Compact dtypes for the per-game record produced by simulation.play_game
+RECORD_SCHEMA = pa.schema([
+    ("game_id", pa.int32()),
+    ("seed", pa.int64()),
+    ("winner", pa.int8()),
+    ("turns", pa.int16()),
+    ("two_eyed_jacks", pa.int16()),
+    ("one_eyed_jacks", pa.int16()),
+    ("dead_cards", pa.int16()),
+])
+
+def _info_column(value: Any, n: int) -> pa.Array:
+    # Batch-wide constants (board type, strategies, master seed). Parquet
+    # dictionary/RLE-encodes these, so they cost next to nothing on disk.
+    if isinstance(value, str):
+        return pa.array([value] * n, pa.string())
+    if isinstance(value, bool):
+        return pa.array([value] * n, pa.bool_())
+    if isinstance(value, int):
+        return pa.array([value] * n, pa.int64())
+    return pa.array([json.dumps(value)] * n, pa.string())
+
+class ResultSink:
+    """Appends per-game records to Parquet files for one batch.
+
+    Records are buffered and written every `rows_per_file` rows (and on
+    close). `info` holds batch-wide values stored as extra columns; an
+    existing batch_id is appended to, which is how a resumed batch is stored.
+    """
+    def __init__(self, root: str, batch_id: Optional[str] = None, info: Optional[Dict[str, Any]] = None,
+                 rows_per_file: int = 50_000):
+        self.root = root
+        self.batch_id = batch_id or uuid.uuid4().hex[:12]
+        self.info: Dict[str, Any] = dict(info or {})
+        self.rows_per_file = rows_per_file
+        self.path = os.path.join(root, f"batch_id={self.batch_id}")
+        os.makedirs(self.path, exist_ok=True)
+        self._buffer: List[dict] = []
+        self._part = len([f for f in os.listdir(self.path) if f.endswith(".parquet")])
+        self.rows_written = 0
+
+    def write(self, record: dict):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.rows_per_file:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        columns = {name: pa.array([r[name] for r in self._buffer], type=RECORD_SCHEMA.field(name).type)
+                   for name in RECORD_SCHEMA.names}
+        n = len(self._buffer)
+        for key, value in self.info.items():
+            columns[key] = _info_column(value, n)
+        table = pa.table(columns)
+        pq.write_table(table, os.path.join(self.path, f"part-{self._part:05d}.parquet"), compression="zstd")
+        self._part += 1
+        self.rows_written += n
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class ResultStore:
+    """Read side: query and aggregate across every batch under root."""
+    def __init__(self, root: str):
+        self.root = root
+
+    def dataset(self) -> ds.Dataset:
+        return ds.dataset(self.root, format="parquet", partitioning="hive")
+
+    def batches(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name.split("=", 1)[1] for name in os.listdir(self.root) if name.startswith("batch_id="))
+
+    def query(self, columns: Optional[Sequence[str]] = None, filter: Optional[pc.Expression] = None):
+        """Selected columns/rows as a pandas DataFrame; only those are read from disk."""
+        return self.dataset().to_table(columns=list(columns) if columns else None, filter=filter).to_pandas()
+
+    def aggregate(self, group_by: Sequence[str] = ("batch_id",), filter: Optional[pc.Expression] = None):
+        """Games, wins per seat, draws and turn statistics per group, computed in Arrow."""
+        group_by = list(group_by)
+        table = self.dataset().to_table(columns=group_by + ["winner", "turns"], filter=filter)
+        winner = table["winner"]
+        table = table.append_column("p0_win", pc.cast(pc.equal(winner, 0), pa.int32()))
+        table = table.append_column("p1_win", pc.cast(pc.equal(winner, 1), pa.int32()))
+        table = table.append_column("no_winner", pc.cast(pc.equal(winner, -1), pa.int32()))
+        result = table.group_by(group_by).aggregate([
+            ("winner", "count"),
+            ("p0_win", "sum"),
+            ("p1_win", "sum"),
+            ("no_winner", "sum"),
+            ("turns", "mean"),
+            ("turns", "stddev"),
+        ])
+        df = result.to_pandas().rename(columns={
+            "winner_count": "games",
+            "p0_win_sum": "p0_wins",
+            "p1_win_sum": "p1_wins",
+            "no_winner_sum": "no_winner",
+            "turns_mean": "avg_turns",
+            "turns_stddev": "std_turns",
+        })
+        df["p0_win_rate"] = df["p0_wins"] / df["games"]
+        df["p1_win_rate"] = df["p1_wins"] / df["games"]
+        return df
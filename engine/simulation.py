@@ -1,74 +1,244 @@
+import numpy as np
 import pandas as pd
 from engine.game import SequenceGame
 from engine.ai import SequenceAI
 from engine.models import Player
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterator, Optional, Tuple
+import math
 import time
 
+def derive_game_seed(master_seed: int, game_index: int) -> int:
+    """Independent 63-bit seed (fits an int64 column) for game game_index of a batch.
+
+    Derived from (master_seed, game_index) alone via SeedSequence spawn keys,
+    so any game can be replayed, and batches sharded or resumed, without
+    knowing how the rest of the batch was run.
+    """
+    seq = np.random.SeedSequence(master_seed, spawn_key=(game_index,))
+    return int(seq.generate_state(1, dtype=np.uint64)[0]) >> 1
+
+def new_master_seed() -> int:
+    """Fresh OS-entropy master seed, kept to 52 bits so it survives JSON/JavaScript numbers."""
+    return int(np.random.SeedSequence().generate_state(1, dtype=np.uint64)[0]) >> 12
+
+def simulate_game(seed: int, board_type: str, strategy_p1: str, strategy_p2: str, teams: bool = True,
+                  board_backend: str = "bitboard"):
+    """Plays one AI vs AI game to completion. Returns (game, turns)."""
+    # Events are only kept when a strategy reads them (MCTS tracks played cards)
+    game = SequenceGame(num_players=2, board_type=board_type, teams=teams, seed=seed,
+                        board_backend=board_backend, log_events="mcts" in (strategy_p1, strategy_p2))
+    game.players[0].strategy = strategy_p1
+    game.players[1].strategy = strategy_p2
+
+    turns = 0
+    limit = 300 # Limit to prevent infinite stuck games
+
+    while game.winner is None and turns < limit:
+        current_p = game.current_player
+        move = SequenceAI.get_move(game, current_p)
+
+        if move:
+            idx, target = move
+            game.play_move(idx, target)
+        else:
+            # Dead card check
+            dead_idx = game.find_dead_card(current_p.id)
+            if dead_idx is not None:
+                game.replace_dead_card(dead_idx)
+            else:
+                break # Stuck
+        turns += 1
+
+    return game, turns
+
+def play_game(game_id: int, seed: int, board_type: str, strategy_p1: str, strategy_p2: str, teams: bool = True,
+              board_backend: str = "bitboard") -> dict:
+    """Plays one AI vs AI game to completion and returns its result record."""
+    game, turns = simulate_game(seed, board_type, strategy_p1, strategy_p2, teams, board_backend)
+
+    # Record Stats (the log keeps exact counters even with events disabled)
+    winner = game.winner
+    return {
+        "game_id": game_id,
+        "seed": seed,
+        "winner": winner if winner is not None else -1,
+        "turns": turns,
+        "two_eyed_jacks": game.log.two_eyed_jacks,
+        "one_eyed_jacks": game.log.one_eyed_jacks,
+        "dead_cards": game.log.dead_cards
+    }
+
+def wilson_interval(successes: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion."""
+    if n == 0:
+        return (0.0, 1.0)
+    p = successes / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return (max(0.0, centre - half), min(1.0, centre + half))
+
+class RunningStats:
+    """Constant-memory aggregates over a stream of result records.
+
+    Win counts per winner value (-1 = no winner) with Wilson 95% intervals,
+    and mean turns with a normal 95% interval (Welford's online variance).
+    """
+    def __init__(self):
+        self.games = 0
+        self.win_counts: Dict[int, int] = {}
+        self._mean_turns = 0.0
+        self._m2_turns = 0.0
+
+    def update(self, record: dict):
+        self.games += 1
+        winner = record["winner"]
+        self.win_counts[winner] = self.win_counts.get(winner, 0) + 1
+        delta = record["turns"] - self._mean_turns
+        self._mean_turns += delta / self.games
+        self._m2_turns += delta * (record["turns"] - self._mean_turns)
+
+    @property
+    def avg_turns(self) -> float:
+        return self._mean_turns
+
+    def turns_interval(self, z: float = 1.96) -> Tuple[float, float]:
+        if self.games < 2:
+            return (self._mean_turns, self._mean_turns)
+        half = z * math.sqrt(self._m2_turns / (self.games - 1) / self.games)
+        return (self._mean_turns - half, self._mean_turns + half)
+
+    def snapshot(self) -> dict:
+        return {
+            "games": self.games,
+            "win_counts": dict(self.win_counts),
+            "win_rate_ci": {w: wilson_interval(n, self.games) for w, n in self.win_counts.items()},
+            "avg_turns": self.avg_turns,
+            "turns_ci": self.turns_interval(),
+        }
+
+JACK_COLUMNS = ("two_eyed_jacks", "one_eyed_jacks", "dead_cards")
+
+def summarize_results(df: pd.DataFrame, aggregates=("win_rates", "turns_histogram", "jack_usage"),
+                      turn_bins: int = 20) -> dict:
+    """Server-side aggregates over a batch's result rows.
+
+    win_rates: wins, rate and Wilson interval per seat (plus games with no winner).
+    turns_histogram: equal-width bin edges and counts of game length.
+    jack_usage: {column: {value: games}} for jack plays and dead-card swaps per game.
+    """
+    games = len(df)
+    summary = {}
+    if "win_rates" in aggregates:
+        counts = df["winner"].value_counts().to_dict() if games else {}
+        summary["win_rates"] = {
+            int(seat): {"wins": int(n), "rate": n / games, "ci": wilson_interval(int(n), games)}
+            for seat, n in sorted(counts.items())
+        }
+    if "turns_histogram" in aggregates:
+        if games:
+            counts, edges = np.histogram(df["turns"].to_numpy(), bins=turn_bins)
+        else:
+            counts, edges = np.zeros(0, dtype=int), np.zeros(0)
+        summary["turns_histogram"] = {"edges": edges.tolist(), "counts": counts.tolist()}
+    if "jack_usage" in aggregates:
+        summary["jack_usage"] = {
+            column: {int(v): int(n) for v, n in df[column].value_counts().sort_index().items()}
+            for column in JACK_COLUMNS if column in df
+        }
+    return summary
+
 class SimulationRunner:
     @staticmethod
-    def run_batch(num_games: int, board_type: str, strategy_p1: str, strategy_p2: str, teams: bool = True):
-        results = []
-        
-        print(f"Starting Batch Simulation: {num_games} games, {board_type} board, {strategy_p1} vs {strategy_p2}")
-        
+    def iter_batch(num_games: int, board_type: str, strategy_p1: str, strategy_p2: str, teams: bool = True,
+                   board_backend: str = "bitboard", workers: int = 1, master_seed: Optional[int] = None,
+                   start_index: int = 0, executor: Optional[ProcessPoolExecutor] = None) -> Iterator[dict]:
+        """Yields result records as games finish, without keeping them.
+
+        Same games and seeds as run_batch. With workers > 1 records arrive in
+        completion order and only a few games per worker are in flight at once.
+        Pass master_seed to be able to reproduce the stream. A shared
+        executor may be passed in; it is used as-is and left running.
+        Closing the generator early cancels games not yet started.
+        """
+        if master_seed is None:
+            master_seed = new_master_seed()
+
+        jobs = ((i, derive_game_seed(master_seed, i), board_type, strategy_p1, strategy_p2, teams, board_backend)
+                for i in range(start_index, start_index + num_games))
+        if workers <= 1 and executor is None:
+            for job in jobs:
+                yield play_game(*job)
+            return
+
+        pool = executor or ProcessPoolExecutor(max_workers=workers)
+        pending = set()
+        try:
+            for job in jobs:
+                pending.add(pool.submit(play_game, *job))
+                if len(pending) >= max(workers, 1) * 4:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            if executor is None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def run_batch(num_games: int, board_type: str, strategy_p1: str, strategy_p2: str, teams: bool = True,
+                  board_backend: str = "bitboard", workers: int = 1, master_seed: Optional[int] = None,
+                  start_index: int = 0, sink=None):
+        """Plays games start_index .. start_index + num_games - 1 of a batch.
+
+        Each game's seed comes from derive_game_seed(master_seed, game_id) and
+        is stored in the "seed" column, so results do not depend on the worker
+        count and a batch can be split or resumed via start_index. workers > 1
+        shards games across a process pool; rows come back in game_id order.
+        The master seed is kept in df.attrs["master_seed"].
+        If a results_store.ResultSink is given, every record is also appended
+        to it, tagged with the batch settings.
+        """
+        if master_seed is None:
+            master_seed = new_master_seed()
+        if sink is not None:
+            for key, value in [("board_type", board_type), ("strategy_p1", strategy_p1),
+                               ("strategy_p2", strategy_p2), ("master_seed", master_seed)]:
+                sink.info.setdefault(key, value)
+
+        print(f"Starting Batch Simulation: {num_games} games, {board_type} board, {strategy_p1} vs {strategy_p2} "
+              f"(master seed {master_seed})")
+
         start_time = time.time()
-        
-        for i in range(num_games):
-            seed = i + int(time.time()) # Simple unique seed
-            game = SequenceGame(num_players=2, board_type=board_type, teams=teams, seed=seed)
-            game.players[0].strategy = strategy_p1
-            game.players[1].strategy = strategy_p2
-            
-            turns = 0
-            limit = 300 # Limit to prevent infinite stuck games
-            
-            while game.winner is None and turns < limit:
-                current_p = game.current_player
-                move = SequenceAI.get_move(game, current_p)
-                
-                if move:
-                    idx, target = move
-                    game.play_move(idx, target)
-                else:
-                    # Dead card check
-                    dead_idx = game.find_dead_card(current_p.id)
-                    if dead_idx is not None:
-                        game.replace_dead_card(dead_idx)
-                    else:
-                        break # Stuck
-                turns += 1
-            
-            # Record Stats
-            winner = game.winner
-            # Calculate Jack Usage if possible?
-            # Scan log for Jack usage
-            two_eyed = 0
-            one_eyed = 0
-            dead_card_swaps = 0
-            
-            for entry in game.log:
-                if entry.get("action") == "dead_card":
-                    dead_card_swaps += 1
-                elif "card" in entry:
-                    c_str = entry["card"]
-                    if "J" in c_str:
-                        # Crude check, Card object not stored in log as obj
-                        # We need better logging or parsing
-                        if "♥" in c_str or "♠" in c_str: one_eyed += 1 # Rough guess map to suits
-                        else: two_eyed += 1
-                        
-            results.append({
-                "game_id": i,
-                "winner": winner if winner is not None else -1,
-                "turns": turns,
-                "two_eyed_jacks": two_eyed,
-                "one_eyed_jacks": one_eyed,
-                "dead_cards": dead_card_swaps
-            })
-            
-            if (i+1) % 10 == 0:
-                print(f"Completed {i+1}/{num_games} games...")
-                
+
+        results = []
+        for record in SimulationRunner.iter_batch(num_games, board_type, strategy_p1, strategy_p2, teams,
+                                                  board_backend, workers, master_seed, start_index):
+            results.append(record)
+            if sink is not None:
+                sink.write(record)
+            if len(results) % 10 == 0:
+                print(f"Completed {len(results)}/{num_games} games...")
+        if sink is not None:
+            sink.flush()
+        results.sort(key=lambda record: record["game_id"])
+
         elapsed = time.time() - start_time
         print(f"Batch finished in {elapsed:.2f}s")
-        return pd.DataFrame(results)
+        df = pd.DataFrame(results)
+        df.attrs["master_seed"] = master_seed
+        return df
+
+    @staticmethod
+    def replay_game(master_seed: int, game_id: int, board_type: str, strategy_p1: str, strategy_p2: str,
+                    teams: bool = True, board_backend: str = "bitboard") -> SequenceGame:
+        """Re-plays a single game of a batch exactly, e.g. for profiling or inspection."""
+        game, _ = simulate_game(derive_game_seed(master_seed, game_id), board_type, strategy_p1, strategy_p2,
+                                teams, board_backend)
+        return game
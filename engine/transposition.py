@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+class TranspositionTable:
+    """Bounded LRU cache keyed by position hash.
+
+    Lookups refresh an entry's age; once full, the least recently used entry
+    is evicted. Hit/miss/eviction counters are kept for tuning the size.
+    """
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def resize(self, max_entries: int):
+        self.max_entries = max_entries
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+class PositionEval:
+    """Cached, hand-independent facts about a position for one team.
+
+    sequences: the team's current sequence count.
+    gains: {cell: count} for empty cells where a team chip raises the count.
+    chain_lengths: {cell: longest team/corner run through cell}, filled lazily.
+    """
+    __slots__ = ("sequences", "gains", "chain_lengths")
+
+    def __init__(self, sequences: int, gains: Dict[Tuple[int, int], int]):
+        self.sequences = sequences
+        self.gains = gains
+        self.chain_lengths: Dict[Tuple[int, int], int] = {}
+
+    def sequences_after(self, cell: Tuple[int, int]) -> int:
+        """Team's sequence count after placing a chip on the empty cell."""
+        return self.gains.get(cell, self.sequences)
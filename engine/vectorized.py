@@ -0,0 +1,356 @@
+# Batched NumPy engine for large two-player simulation runs.
+# Advances many games in lockstep: boards, hands and decks are arrays with one
+# row per game, and move legality, placement, locking and sequence counting
+# are computed for all unfinished games at once. Rules, the turn limit and the
+# "random"/"smart" strategies follow SequenceGame, simulate_game and SequenceAI,
+# so win rates and game lengths match the reference engine statistically
+# (individual games differ: the RNG streams are not the same).
+import random
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .board import get_layout, CORNERS, LINES, CELL_LINES, WINDOWS, CELL_WINDOWS
+from .models import CARDS, NUM_CARDS
+from .simulation import derive_game_seed, new_master_seed
+
+VECTORIZED_STRATEGIES = ("random", "smart")
+
+TURN_LIMIT = 300  # Same cap as simulate_game
+HAND_SIZE = 7
+NO_CARD = NUM_CARDS  # Empty hand slot
+SENTINEL = 100  # Extra cell column that is always empty, used to pad lines/windows
+
+CORNER = np.zeros(SENTINEL + 1, dtype=bool)
+for _r, _c in CORNERS:
+    CORNER[_r * 10 + _c] = True
+PLAYABLE = ~CORNER[:SENTINEL]
+
+IS_TWO_EYED = np.array([card.is_two_eyed_jack for card in CARDS] + [False])
+IS_ONE_EYED = np.array([card.is_one_eyed_jack for card in CARDS] + [False])
+IS_JACK = IS_TWO_EYED | IS_ONE_EYED
+
+# LINE_CELLS[line] -> its cell indices, padded with SENTINEL to length 10
+LINE_CELLS = np.full((len(LINES), 10), SENTINEL, dtype=np.intp)
+for _i, _line in enumerate(LINES):
+    LINE_CELLS[_i, :len(_line)] = [r * 10 + c for r, c in _line]
+# CELL_LINE_IDX / CELL_LINE_POS[cell] -> the 4 lines through a cell and its position in each
+CELL_LINE_IDX = np.array([[line for line, _ in CELL_LINES[idx // 10][idx % 10]] for idx in range(100)])
+CELL_LINE_POS = np.array([[pos for _, pos in CELL_LINES[idx // 10][idx % 10]] for idx in range(100)])
+
+# CELL_WINDOW_CELLS[cell] -> cells of the windows through a cell, padded with sentinel windows
+_max_windows = max(len(CELL_WINDOWS[idx // 10][idx % 10]) for idx in range(100))
+CELL_WINDOW_CELLS = np.full((100, _max_windows, 5), SENTINEL, dtype=np.intp)
+for _idx in range(100):
+    for _k, _w in enumerate(CELL_WINDOWS[_idx // 10][_idx % 10]):
+        CELL_WINDOW_CELLS[_idx, _k] = [r * 10 + c for r, c in WINDOWS[_w]]
+
+# 8-neighbourhood of each cell, padded with SENTINEL
+NEIGHBOURS = np.full((100, 8), SENTINEL, dtype=np.intp)
+for _idx in range(100):
+    _r, _c = divmod(_idx, 10)
+    _ns = [(_r + dr) * 10 + _c + dc for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+           if (dr or dc) and 0 <= _r + dr < 10 and 0 <= _c + dc < 10]
+    NEIGHBOURS[_idx, :len(_ns)] = _ns
+
+# Positional term of the smart heuristic: 10 - Manhattan distance from the centre
+CENTRE_SCORE = np.array([10 - (abs(idx // 10 - 4.5) + abs(idx % 10 - 4.5)) for idx in range(100)])
+CHAIN_BONUS = np.zeros(11, dtype=np.int64)
+CHAIN_BONUS[[2, 3, 4]] = [5, 20, 50]
+
+# Deck order before shuffling (as models.Deck) and the random-layout card pool (as Board)
+DECK_CODES = np.array([code for _ in range(2) for code in range(NUM_CARDS)], dtype=np.int8)
+LAYOUT_CODES = np.array([code for code in range(NUM_CARDS) if not CARDS[code].is_jack
+                         for _ in range(2)], dtype=np.int8)
+
+def _standard_layout():
+    # Card code per cell (-1 on corners) and, per cell, its position in
+    # card_positions for that card, which is the order SequenceAI sees moves in.
+    layout = get_layout("standard", random.Random(0))
+    cards = np.full(100, -1, dtype=np.int8)
+    order = np.zeros(100, dtype=np.int64)
+    for card_id, cells in layout.card_positions.items():
+        for k, (r, c) in enumerate(cells):
+            cards[r * 10 + c] = card_id
+            order[r * 10 + c] = k
+    return cards, order
+
+STANDARD_CARDS, STANDARD_ORDER = _standard_layout()
+ROW_MAJOR_CELLS = np.flatnonzero(PLAYABLE)
+
+def _runs(owned: np.ndarray):
+    """Lengths of the owned runs ending just before / starting just after each position.
+
+    owned is (..., 10) along lines; returns (left, right) of the same shape.
+    """
+    left = np.zeros(owned.shape, dtype=np.int64)
+    right = np.zeros(owned.shape, dtype=np.int64)
+    for k in range(1, 10):
+        left[..., k] = (left[..., k - 1] + 1) * owned[..., k - 1]
+        right[..., 9 - k] = (right[..., 10 - k] + 1) * owned[..., 10 - k]
+    return left, right
+
+def _placement_gains(owned: np.ndarray, cells: np.ndarray = None):
+    """Sequence gain and chain length for putting a team chip on each cell.
+
+    A chip joins the runs on either side along each of its 4 lines; a line's
+    count is the sum of run // 5, so the gain is the merged run's // 5 minus
+    the two parts'. Chain length is the longest merged run (SequenceAI.chain_length).
+    owned is (games, 101) team chips | corners; cells optionally picks one cell
+    per game, otherwise all 100 cells are returned.
+    """
+    if cells is None:
+        left, right = _runs(owned[:, LINE_CELLS])
+        left = left[:, CELL_LINE_IDX, CELL_LINE_POS]
+        right = right[:, CELL_LINE_IDX, CELL_LINE_POS]
+    else:
+        rows = np.arange(len(owned))[:, None]
+        left, right = _runs(owned[rows[:, :, None], LINE_CELLS[CELL_LINE_IDX[cells]]])
+        left = left[rows, np.arange(4), CELL_LINE_POS[cells]]
+        right = right[rows, np.arange(4), CELL_LINE_POS[cells]]
+    merged = left + 1 + right
+    gains = (merged // 5 - left // 5 - right // 5).sum(-1)
+    return gains, merged.max(-1)
+
+def _first(mask: np.ndarray, key: np.ndarray):
+    """Per game, the flat index of the True entry with the smallest key (or -1)."""
+    flat = mask.reshape(len(mask), -1)
+    keyed = np.where(flat, key.reshape(len(key), -1), np.iinfo(np.int64).max)
+    choice = keyed.argmin(1)
+    return np.where(flat.any(1), choice, -1)
+
+class VectorizedGames:
+    """State of num_games two-player games, one row per game.
+
+    chips hold the team id (-1 empty) per cell plus an always-empty sentinel
+    cell; hands are card codes with NO_CARD in unused slots, kept in the same
+    order a Player.hand would be (played card removed, draw appended).
+    """
+    def __init__(self, seeds, board_type: str = "standard", teams: bool = True):
+        n = len(seeds)
+        self.num_games = n
+        self.required = 2 if teams else 1
+        self.cards = np.empty((n, 100), dtype=np.int8)
+        self.order = np.empty((n, 100), dtype=np.int64)
+        self.deck = np.empty((n, len(DECK_CODES)), dtype=np.int8)
+        self.uniforms = np.empty((n, TURN_LIMIT))
+        for g, seed in enumerate(seeds):
+            # Each game's layout, deck and random choices come from its own seed
+            rng = np.random.default_rng(seed)
+            if board_type == "random":
+                self.cards[g, CORNER[:SENTINEL]] = -1
+                self.cards[g, ROW_MAJOR_CELLS] = rng.permutation(LAYOUT_CODES)
+                self.order[g] = np.arange(100)
+            else:
+                self.cards[g] = STANDARD_CARDS
+                self.order[g] = STANDARD_ORDER
+            self.deck[g] = rng.permutation(DECK_CODES)
+            self.uniforms[g] = rng.random(TURN_LIMIT)
+
+        # Deal as SequenceGame.deal_cards: one card each per round, from the end of the deck
+        dealt = self.deck[:, ::-1][:, :2 * HAND_SIZE]
+        self.hands = np.stack([dealt[:, 0::2], dealt[:, 1::2]], axis=1)
+        self.deck_size = np.full(n, len(DECK_CODES) - 2 * HAND_SIZE)
+
+        self.chips = np.full((n, SENTINEL + 1), -1, dtype=np.int8)
+        self.locked = np.zeros((n, SENTINEL + 1), dtype=bool)
+        self.sequences = np.zeros((n, 2), dtype=np.int64)
+        self.turn = np.zeros(n, dtype=np.int64)
+        self.turns = np.zeros(n, dtype=np.int64)
+        self.winner = np.full(n, -1, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.two_eyed_jacks = np.zeros(n, dtype=np.int64)
+        self.one_eyed_jacks = np.zeros(n, dtype=np.int64)
+        self.dead_cards = np.zeros(n, dtype=np.int64)
+
+    def owned(self, games: np.ndarray, team: np.ndarray) -> np.ndarray:
+        """Team chips | corners for the given games, (len(games), 101)."""
+        return (self.chips[games] == team[:, None]) | CORNER
+
+    def legal_moves(self, games: np.ndarray):
+        """(games, hand slot, cell) mask of legal moves for the player to move, and their hands."""
+        team = self.turn[games]
+        hand = self.hands[games, team]
+        chips = self.chips[games, :SENTINEL]
+        empty = (chips == -1) & PLAYABLE
+        removable = (chips == (1 - team)[:, None]) & ~self.locked[games, :SENTINEL]
+        matches = self.cards[games][:, None, :] == hand[:, :, None]
+        legal = (matches | IS_TWO_EYED[hand][:, :, None]) & empty[:, None, :]
+        legal |= IS_ONE_EYED[hand][:, :, None] & removable[:, None, :]
+        return legal, hand
+
+    def _draw(self, games: np.ndarray) -> np.ndarray:
+        has_card = self.deck_size[games] > 0
+        top = np.maximum(self.deck_size[games] - 1, 0)
+        drawn = np.where(has_card, self.deck[games, top], NO_CARD)
+        self.deck_size[games] -= has_card
+        return drawn
+
+    def _replace_slot(self, games: np.ndarray, slot: np.ndarray):
+        # hand.pop(slot) followed by hand.append(draw), as SequenceGame does
+        team = self.turn[games]
+        extended = np.concatenate([self.hands[games, team], self._draw(games)[:, None]], axis=1)
+        positions = np.arange(HAND_SIZE)[None, :]
+        positions = positions + (positions >= slot[:, None])
+        self.hands[games, team] = np.take_along_axis(extended, positions, axis=1)
+
+    def replace_dead_cards(self, games: np.ndarray, hand: np.ndarray):
+        """Games whose player has no legal move: swap the first dead card or end the game.
+
+        With no legal move every non-jack card is dead (both its cells are taken),
+        so this is the first non-jack card, as SequenceGame.find_dead_card returns.
+        """
+        candidates = (hand != NO_CARD) & ~IS_JACK[hand]
+        has_dead = candidates.any(1)
+        stuck = games[~has_dead]
+        self.done[stuck] = True
+        games = games[has_dead]
+        self._replace_slot(games, candidates[has_dead].argmax(1))
+        self.dead_cards[games] += 1
+        self.turns[games] += 1
+
+    def apply(self, games: np.ndarray, slot: np.ndarray, cell: np.ndarray):
+        team = self.turn[games]
+        card = self.hands[games, team, slot]
+        removal = IS_ONE_EYED[card]
+        self.one_eyed_jacks[games] += removal
+        self.two_eyed_jacks[games] += IS_TWO_EYED[card]
+        self.chips[games[removal], cell[removal]] = -1
+        self._replace_slot(games, slot)
+
+        placed, cell, team = games[~removal], cell[~removal], team[~removal]
+        gains, _ = _placement_gains(self.owned(placed, team), cell)
+        self.chips[placed, cell] = team
+        self.sequences[placed, team] += gains
+        # Lock every complete window through the new chip
+        window_cells = CELL_WINDOW_CELLS[cell]
+        owned = self.owned(placed, team)
+        complete = owned[np.arange(len(placed))[:, None, None], window_cells].all(-1)
+        lock_games = np.broadcast_to(placed[:, None, None], window_cells.shape)[complete]
+        lock_cells = window_cells[complete]
+        playable = ~CORNER[lock_cells]
+        self.locked[lock_games[playable], lock_cells[playable]] = True
+
+        won = self.sequences[placed, team] >= self.required
+        self.winner[placed[won]] = team[won]
+        self.done[placed[won]] = True
+        self.turn[games] = 1 - self.turn[games]
+        self.turns[games] += 1
+
+    def random_choice(self, games: np.ndarray, legal: np.ndarray) -> np.ndarray:
+        """Uniform choice over all (slot, cell) moves, as SequenceAI.get_random_move."""
+        # Pick the k-th legal move: first its slot from per-slot counts, then the cell
+        rows = np.arange(len(games))
+        counts = legal.sum(2)
+        ends = counts.cumsum(1)
+        pick = (self.uniforms[games, self.turns[games]] * ends[:, -1]).astype(np.int64)
+        slot = (ends > pick[:, None]).argmax(1)
+        pick -= ends[rows, slot] - counts[rows, slot]
+        cell = (legal[rows, slot].cumsum(1, dtype=np.int8) > pick[:, None]).argmax(1)
+        return slot * 100 + cell
+
+    def smart_choice(self, games: np.ndarray, legal: np.ndarray, hand: np.ndarray) -> np.ndarray:
+        """SequenceAI.get_smart_move, with its move order used for tie-breaks."""
+        n = len(games)
+        team = self.turn[games]
+        one_eyed = IS_ONE_EYED[hand][:, :, None]
+        placements = legal & ~one_eyed
+        # Moves are listed slot by slot; jacks list cells row-major, other cards
+        # in card_positions order
+        cell_key = np.where(IS_JACK[hand][:, :, None], np.arange(100), self.order[games][:, None, :])
+        key = np.arange(HAND_SIZE)[None, :, None] * 1000 + cell_key
+
+        own_gain, chain = _placement_gains(self.owned(games, team))
+        opp_gain, _ = _placement_gains(self.owned(games, 1 - team))
+        own = self.sequences[games, team][:, None]
+        opp = self.sequences[games, 1 - team][:, None]
+
+        # 1. Win, 3. complete a sequence
+        win = _first(placements & (own + own_gain >= self.required)[:, None, :], key)
+        complete = _first(placements & (own_gain > 0)[:, None, :], key)
+
+        # 2. Block the lowest threatened cell we can fill
+        threats = (opp + opp_gain >= self.required) & (opp_gain > 0)
+        fillable = placements.any(1) & threats
+        threat_cell = fillable.argmax(1)
+        block_moves = np.zeros_like(placements)
+        block_moves[np.arange(n), :, threat_cell] = placements[np.arange(n), :, threat_cell]
+        block = np.where(fillable.any(1), _first(block_moves, key), -1)
+
+        # 4. Positional score
+        opp_neighbours = (self.chips[games][:, NEIGHBOURS] == (1 - team)[:, None, None]).sum(-1)
+        place_score = CHAIN_BONUS[np.minimum(chain, 10)] + CENTRE_SCORE
+        score = np.where(one_eyed, 10 + opp_neighbours[:, None, :] * 5,
+                         place_score[:, None, :] - 15 * IS_TWO_EYED[hand][:, :, None])
+        score = np.where(legal, score, -np.inf)
+        best = score.reshape(n, -1).max(1)
+        positional = _first(legal & (score == best[:, None, None]), key)
+
+        choice = positional
+        for option in (complete, block, win):
+            choice = np.where(option >= 0, option, choice)
+        return choice
+
+    def step(self, strategies) -> int:
+        """Plays one turn in every unfinished game. Returns how many were played."""
+        games = np.flatnonzero(~self.done)
+        if not len(games):
+            return 0
+        legal, hand = self.legal_moves(games)
+        has_move = legal.any((1, 2))
+        self.replace_dead_cards(games[~has_move], hand[~has_move])
+
+        games, legal, hand = games[has_move], legal[has_move], hand[has_move]
+        choice = np.empty(len(games), dtype=np.int64)
+        for team, strategy in enumerate(strategies):
+            sel = self.turn[games] == team
+            if not sel.any():
+                continue
+            if strategy == "smart":
+                choice[sel] = self.smart_choice(games[sel], legal[sel], hand[sel])
+            else:
+                choice[sel] = self.random_choice(games[sel], legal[sel])
+        self.apply(games, choice // 100, choice % 100)
+
+        self.done |= self.turns >= TURN_LIMIT
+        return len(games) + int((~has_move).sum())
+
+    def run(self, strategies):
+        while self.step(strategies):
+            pass
+
+def run_vectorized_batch(num_games: int, board_type: str, strategy_p1: str, strategy_p2: str,
+                         teams: bool = True, master_seed: Optional[int] = None, start_index: int = 0,
+                         chunk_size: int = 4096) -> pd.DataFrame:
+    """Plays a batch on the vectorized engine; same columns as SimulationRunner.run_batch.
+
+    Seeds come from derive_game_seed(master_seed, game_id), and a game's
+    result depends only on its seed, so chunking does not change results.
+    Only the "random" and "smart" strategies are supported.
+    """
+    for strategy in (strategy_p1, strategy_p2):
+        if strategy not in VECTORIZED_STRATEGIES:
+            raise ValueError(f"Strategy not supported by the vectorized engine: {strategy}")
+    if master_seed is None:
+        master_seed = new_master_seed()
+
+    frames = []
+    for start in range(start_index, start_index + num_games, chunk_size):
+        game_ids = np.arange(start, min(start + chunk_size, start_index + num_games))
+        seeds = [derive_game_seed(master_seed, int(i)) for i in game_ids]
+        batch = VectorizedGames(seeds, board_type, teams)
+        batch.run((strategy_p1, strategy_p2))
+        frames.append(pd.DataFrame({
+            "game_id": game_ids,
+            "seed": seeds,
+            "winner": batch.winner,
+            "turns": batch.turns,
+            "two_eyed_jacks": batch.two_eyed_jacks,
+            "one_eyed_jacks": batch.one_eyed_jacks,
+            "dead_cards": batch.dead_cards,
+        }))
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=["game_id", "seed", "winner", "turns", "two_eyed_jacks", "one_eyed_jacks", "dead_cards"])
+    df.attrs["master_seed"] = master_seed
+    return df
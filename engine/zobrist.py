@@ -0,0 +1,28 @@
+import random
+from typing import List
+
+# Zobrist keys for position hashing. Fixed seed so hashes are stable across
+# processes and runs (usable as keys in shared caches and stored analytics).
+MAX_TEAMS = 12  # one team per player at most; the game supports up to 12 players
+NUM_CELLS = 100
+
+_rng = random.Random(0x5E9_2B1D)
+
+# CHIP_KEYS[team_id][r * 10 + c]
+CHIP_KEYS: List[List[int]] = [[_rng.getrandbits(64) for _ in range(NUM_CELLS)] for _ in range(MAX_TEAMS)]
+# LOCK_KEYS[r * 10 + c]
+LOCK_KEYS: List[int] = [_rng.getrandbits(64) for _ in range(NUM_CELLS)]
+# TURN_KEYS[current_turn_index] (side to move)
+TURN_KEYS: List[int] = [_rng.getrandbits(64) for _ in range(MAX_TEAMS)]
+
+def compute_board_hash(board) -> int:
+    """Hash of a board computed from scratch. Boards maintain the same value incrementally."""
+    h = 0
+    for r in range(10):
+        for c in range(10):
+            team = board.get_chip(r, c)
+            if team is not None:
+                h ^= CHIP_KEYS[team][r * 10 + c]
+            if board.is_locked(r, c):
+                h ^= LOCK_KEYS[r * 10 + c]
+    return h
@@ -68,9 +68,29 @@ export const api = {
         const res = await axios.post<GameState>(`${API_Base}/game/${gameId}/ai-step`, { steps });
         return res.data;
     },
-    simulate: async (trials: number) => {
-        const res = await axios.post(`${API_Base}/simulate/monte-carlo`, { trials, boardType: "standard", aiLevel: "smart" });
-        return res.data;
+    simulate: async (trials: number, onProgress?: (completed: number) => void) => {
+        // Runs as a background job so the API stays free; poll until it finishes
+        const { data: job } = await axios.post(`${API_Base}/simulate/jobs`, { trials, boardType: "standard", aiLevel: "smart" });
+        let summary = job;
+        while (summary.status === 'queued' || summary.status === 'running') {
+            await new Promise(resolve => setTimeout(resolve, 500));
+            summary = (await axios.get(`${API_Base}/simulate/jobs/${job.jobId}`)).data;
+            onProgress?.(summary.completed);
+        }
+        if (summary.status !== 'completed') {
+            throw new Error(summary.error || `Simulation ${summary.status}`);
+        }
+        // First page of raw rows; the rest stay on the server
+        const { data: page } = await axios.get(`${API_Base}/simulate/jobs/${job.jobId}/results`, { params: { limit: 20 } });
+        return {
+            games: summary.completed,
+            masterSeed: summary.masterSeed,
+            win_rates: summary.aggregates.win_counts,
+            avg_turns: summary.aggregates.avg_turns,
+            resultsId: job.jobId,
+            stats: page.rows,
+            nextCursor: page.nextCursor,
+        };
     },
     // Multiplayer
     createRoom: async () => {
@@ -1,12 +1,37 @@
 import { useEffect, useState, useRef, useCallback } from 'react';
 import { useToast } from '../components/ui/ToastProvider';
 
-export const useGameWebSocket = (roomCode: string | undefined) => {
+// Applies a STATE_DELTA (changed cells/players, scalars, new log entries) to a full state
+const applyDelta = (state: any, delta: any) => {
+    const board = state.board.map((row: any[]) => row.slice());
+    for (const cell of delta.cells) {
+        board[cell.r][cell.c] = cell;
+    }
+    const players = state.players.slice();
+    for (const player of delta.players) {
+        players[players.findIndex((p: any) => p.id === player.id)] = player;
+    }
+    return {
+        ...state,
+        board,
+        players,
+        currentTurnIndex: delta.currentTurnIndex,
+        currentPlayerId: delta.currentPlayerId,
+        currentTeamId: delta.currentTeamId,
+        winnerTeam: delta.winnerTeam,
+        cardsLeft: delta.cardsLeft,
+        log: [...state.log, ...delta.log].slice(-10),
+    };
+};
+
+export const useGameWebSocket = (roomCode: string | undefined, spectate: boolean = false) => {
     const [lastMessage, setLastMessage] = useState<any>(null);
     const [isConnected, setIsConnected] = useState(false);
     const [playerId, setPlayerId] = useState<number | null>(null);
     const [playerCount, setPlayerCount] = useState<number>(0);
     const ws = useRef<WebSocket | null>(null);
+    // Last full state and its version, for applying deltas
+    const current = useRef<{ state: any, version: number } | null>(null);
     const { toast } = useToast();
 
     useEffect(() => {
@@ -26,8 +51,15 @@ export const useGameWebSocket = (roomCode: string | undefined) => {
             console.warn("Invalid API_URL, falling back to localhost", e);
         }
 
+        // Spectators join read-only and see no hands
+        if (spectate) socketUrl += '/spectate';
+
+        // Ask for STATE_DELTA messages after the first full state
+        socketUrl += '?protocol=delta';
+
         console.log(`Connecting to ${socketUrl}...`);
 
+        current.current = null;
         ws.current = new WebSocket(socketUrl);
 
         ws.current.onopen = () => {
@@ -45,6 +77,18 @@ export const useGameWebSocket = (roomCode: string | undefined) => {
                     setPlayerId(data.playerId);
                 } else if (data.type === 'PLAYER_COUNT') {
                     setPlayerCount(data.count);
+                } else if (data.type === 'STATE_UPDATE') {
+                    current.current = { state: data.state, version: data.version };
+                    setLastMessage(data);
+                } else if (data.type === 'STATE_DELTA') {
+                    if (!current.current || current.current.version !== data.baseVersion) {
+                        // Missed an update; ask for the full state again
+                        ws.current?.send(JSON.stringify({ type: 'RESYNC' }));
+                        return;
+                    }
+                    const state = applyDelta(current.current.state, data);
+                    current.current = { state, version: data.version };
+                    setLastMessage({ type: 'STATE_UPDATE', version: data.version, state });
                 } else {
                     setLastMessage(data);
                 }
@@ -70,7 +114,7 @@ export const useGameWebSocket = (roomCode: string | undefined) => {
                 ws.current.close();
             }
         };
-    }, [roomCode, toast]);
+    }, [roomCode, spectate, toast]);
 
     const sendMessage = useCallback((type: string, payload: any = {}) => {
         if (ws.current && ws.current.readyState === WebSocket.OPEN) {
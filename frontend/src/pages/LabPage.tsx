@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useState } from 'react';
 import { useQuery } from '@tanstack/react-query';
 import { useSearchParams, useNavigate } from 'react-router-dom';
 import { api } from '../api/client';
@@ -10,10 +10,11 @@ const LabPage = () => {
     const [searchParams] = useSearchParams();
     const navigate = useNavigate();
     const trials = Number(searchParams.get('trials')) || 100;
+    const [completed, setCompleted] = useState(0);
 
     const { data, isLoading } = useQuery({
         queryKey: ['simulation', trials],
-        queryFn: () => api.simulate(trials),
+        queryFn: () => api.simulate(trials, setCompleted),
         staleTime: Infinity, // Don't refetch on focus
     });
 
@@ -21,7 +22,7 @@ const LabPage = () => {
         <div className="min-h-screen flex flex-col items-center justify-center gap-4 bg-slate-950 text-slate-100">
             <Loader2 size={48} className="animate-spin text-emerald-500" />
             <h2 className="text-xl font-bold">Running {trials} Simulations...</h2>
-            <p className="text-slate-400">This simulates thousands of turns. Please wait.</p>
+            <p className="text-slate-400">{completed} / {trials} games done. This simulates thousands of turns. Please wait.</p>
         </div>
     );
 
@@ -0,0 +1,25 @@
+import asyncio
+import time
+
+from backend.ai_runner import AIRunner
+from engine.game import SequenceGame
+
+def test_superseding_request_after_worker_finished():
+    # A's worker finishes while the loop is blocked, then B arrives for the
+    # same key. B must not be aborted by A's (already released) cancel flag.
+    async def run():
+        runner = AIRunner(workers=1)
+        game = SequenceGame(num_players=2, seed=3)
+        try:
+            # Warm the pool so A finishes well inside the blocked second
+            await runner.get_move("warm", game, game.current_player, 10)
+            a = asyncio.create_task(runner.get_move("k", game, game.current_player, 10))
+            await asyncio.sleep(0)
+            time.sleep(1)
+            b = await runner.get_move("k", game, game.current_player, 10)
+            return await a, b
+        finally:
+            runner.shutdown()
+
+    (move_a, state_a), (move_b, state_b) = asyncio.run(run())
+    assert move_a is not None and move_b == move_a and state_b == state_a
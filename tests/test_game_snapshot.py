@@ -0,0 +1,29 @@
+from engine.ai import SequenceAI
+from engine.game import SequenceGame
+
+def play(game, n):
+    for _ in range(n):
+        move = SequenceAI.get_random_move(game, game.current_player)
+        assert move is not None
+        assert game.play_move(*move)
+
+def test_restore_later_snapshot_after_branching():
+    game = SequenceGame(num_players=2, seed=7)
+    a = game.snapshot()
+    play(game, 3)
+    b = game.snapshot()
+    b_log, b_stats, b_cards = list(game.log), game.log.stats(), list(game.log.cards)
+    b_hands = [list(p.hand) for p in game.players]
+
+    game.restore(a)
+    assert len(game.log) == 0 and game.log.stats()["moves"] == 0
+    # A different branch from A
+    game.rng.seed(99)
+    play(game, 2)
+
+    game.restore(b)
+    assert list(game.log) == b_log
+    assert game.log.stats() == b_stats
+    assert [list(p.hand) for p in game.players] == b_hands
+    # MCTS builds its unseen-card pool from these
+    assert list(game.log.cards) == b_cards
@@ -9,7 +9,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from engine.game import SequenceGame, Card
 from engine.ai import SequenceAI
-from engine.simulation import SimulationRunner
+from engine.simulation import SimulationRunner, RunningStats
 
 st.set_page_config(page_title="Sequence Simulator", layout="wide")
 
@@ -164,7 +164,7 @@ def tab_play():
         col1, col2 = st.columns(2)
         p_count = col1.number_input("Players", 2, 8, 2)
         b_type = col2.selectbox("Board Type", ["Standard", "Random"])
-        ai_diff = col1.selectbox("AI Difficulty", ["Smart", "Random"])
+        ai_diff = col1.selectbox("AI Difficulty", ["Smart", "Random", "MCTS"])
         if st.button("Start New Game"):
             init_game(p_count, b_type, ai_diff)
             st.rerun()
@@ -178,7 +178,7 @@ def tab_play():
             
         with col_info:
             st.write("### Game Info")
-            st.write(f"Cards Left: {len(st.session_state.game.deck.cards)}")
+            st.write(f"Cards Left: {len(st.session_state.game.deck)}")
             if st.session_state.game.winner is not None:
                 st.success(f"WINNER: Team {st.session_state.game.winner}")
                 st.balloons()
@@ -188,15 +188,22 @@ def tab_simulation():
     
     col1, col2 = st.columns(2)
     n_games = col1.number_input("Number of Games", 10, 1000, 50)
-    ai_p1 = col2.selectbox("P1 Strategy", ["Random", "Smart"])
-    ai_p2 = col2.selectbox("P2 Strategy", ["Smart", "Random"])
+    ai_p1 = col2.selectbox("P1 Strategy", ["Random", "Smart", "MCTS"])
+    ai_p2 = col2.selectbox("P2 Strategy", ["Smart", "Random", "MCTS"])
     board_t = col1.selectbox("Sim Board", ["Standard", "Random"])
     
     if st.button("Run Simulation"):
-        with st.spinner("Simulating..."):
-            df = SimulationRunner.run_batch(n_games, board_t.lower(), ai_p1.lower(), ai_p2.lower())
-            st.session_state.sim_results = df
-            st.success("Done!")
+        progress = st.progress(0.0)
+        live = st.empty()
+        stats = RunningStats()
+        records = []
+        for record in SimulationRunner.iter_batch(n_games, board_t.lower(), ai_p1.lower(), ai_p2.lower()):
+            records.append(record)
+            stats.update(record)
+            progress.progress(stats.games / n_games)
+            live.write(f"{stats.games}/{n_games} games | wins {stats.win_counts} | avg turns {stats.avg_turns:.1f}")
+        st.session_state.sim_results = pd.DataFrame(records).sort_values("game_id")
+        st.success("Done!")
 
     if "sim_results" in st.session_state:
         df = st.session_state.sim_results